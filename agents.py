@@ -1,27 +1,227 @@
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_google_genai import GoogleGenerativeAIEmbeddings # Import Gemini Embeddings
+import asyncio
 import re
-import PyPDF2
-import io
-from langchain_community.vectorstores import FAISS
-from langchain.chains import RetrievalQA
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from concurrent.futures import ThreadPoolExecutor
 import tempfile
 import os
 import json
+import logging
+import numpy as np
+import telemetry
+from cache import (
+    content_hash,
+    get_answer_cache,
+    get_jd_skills_cache,
+    get_result_cache,
+    normalize_jd_text,
+    normalize_question,
+)
+from pdf_extraction import DocumentExtractionError, get_pdf_pool
+from resume_digest import build_resume_digest, format_resume_context
+from skill_matcher import prescore_skills
+from llm_clients import EMBEDDING_MODEL, LLM_MODEL, get_async_embeddings, get_async_llm, get_embeddings, get_llm, run_sync
+
+logger = logging.getLogger(__name__)
+
+# Batched skill scoring: skills per prompt, size of the skill list per prompt and retrieved chunks per batch
+SKILL_BATCH_SIZE = 12
+SKILL_BATCH_MAX_SKILL_CHARS = 600
+SKILL_BATCH_CONTEXT_DOCS = 4
+
+# Chunks retrieved per single-skill query and per Q&A question
+SKILL_CONTEXT_DOCS = 3
+QA_CONTEXT_DOCS = 3
+
+# Chunks added to the resume digest in each weakness prompt and in the interview prompt
+WEAKNESS_CONTEXT_DOCS = 1
+INTERVIEW_CONTEXT_DOCS = 1
+
+# Cosine similarity above which a reworded question reuses an earlier answer (0 disables)
+QA_SEMANTIC_CACHE_THRESHOLD = float(os.getenv("QA_SEMANTIC_CACHE_THRESHOLD", "0"))
+
+# "llm" scores skills with Gemini; "embedding" scores them from vector similarity only
+SCORING_MODES = ("llm", "embedding")
+
+# Cosine similarities mapped to 0 and 10 in embedding scoring mode (linear in between)
+EMBEDDING_SCORE_THRESHOLDS = (0.60, 0.80)
+
+# A ("Question Type", "Full Question Text") tuple whose closing parenthesis has been generated
+COMPLETE_QUESTION_PATTERN = re.compile(r'\(\s*"([^"]+)"\s*,\s*"([^"]+)"\s*\)')
+
+# Same "stuff" prompt RetrievalQA uses, for calls made without a chain
+QA_PROMPT_TEMPLATE = """Use the following pieces of context to answer the question at the end. If you don't know the answer, just say that you don't know, don't try to make up an answer.
+
+{context}
+
+Question: {question}
+Helpful Answer:"""
+
+
+class ResumeIndex:
+    """Chunked FAISS index over one resume, built once and shared by skill scoring and Q&A"""
+
+    def __init__(self, text, chunks, chunk_embeddings, embeddings, async_embeddings=None):
+        # Heavy LangChain modules are imported on first use to keep app startup fast
+        from langchain_community.vectorstores import FAISS
+
+        self.text = text
+        self.chunks = chunks
+        self.chunk_embeddings = chunk_embeddings
+        # Queries must be embedded by the model the chunks were embedded with; async calls may
+        # need a client bound to the running loop
+        self.embeddings = embeddings
+        self.async_embeddings = async_embeddings or embeddings
+        with telemetry.span("faiss_build", vectors=len(chunks)):
+            self.vectorstore = FAISS.from_embeddings(list(zip(chunks, chunk_embeddings)), embeddings)
+
+    @staticmethod
+    def split_text(text, chunk_size=1000, chunk_overlap=200):
+        from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+        with telemetry.span("chunking", chars=len(text)) as span:
+            text_splitter = RecursiveCharacterTextSplitter(
+                chunk_size=chunk_size,
+                chunk_overlap=chunk_overlap,
+                length_function=len,
+            )
+            chunks = text_splitter.split_text(text)
+            span.set(chunks=len(chunks))
+        return chunks
+
+    @classmethod
+    @telemetry.traced("resume_index")
+    def build(cls, text, embeddings):
+        chunks = cls.split_text(text)
+        return cls(text, chunks, embeddings.embed_documents(chunks), embeddings)
+
+    @classmethod
+    @telemetry.traced("resume_index")
+    async def abuild(cls, text, embeddings, async_embeddings=None):
+        # Splitting and the FAISS build are CPU-bound and run off the event loop
+        chunks = await asyncio.to_thread(cls.split_text, text)
+        chunk_embeddings = await (async_embeddings or embeddings).aembed_documents(chunks)
+        return await asyncio.to_thread(cls, text, chunks, chunk_embeddings, embeddings, async_embeddings)
+
+    def as_retriever(self, k):
+        return self.vectorstore.as_retriever(search_kwargs={"k": k})
+
+    def similarity_search(self, query, k):
+        return self.vectorstore.similarity_search(query, k=k)
+
+    async def asimilarity_search(self, query, k):
+        embedding = await self.async_embeddings.aembed_query(query)
+        return self.vectorstore.similarity_search_by_vector(embedding, k=k)
+
+    def _top_chunks(self, query_vectors, k):
+        query_vectors = np.asarray(query_vectors, dtype=np.float32)
+        chunk_vectors = np.asarray(self.chunk_embeddings, dtype=np.float32)
+        query_vectors /= np.linalg.norm(query_vectors, axis=1, keepdims=True) + 1e-12
+        chunk_vectors /= np.linalg.norm(chunk_vectors, axis=1, keepdims=True) + 1e-12
+        order = np.argsort(-(query_vectors @ chunk_vectors.T), axis=1)[:, :k]
+        return [[self.chunks[index] for index in row] for row in order]
+
+    def match_chunks(self, queries, k):
+        """Top k chunks for each query, embedding all queries in one call"""
+        return self._top_chunks(self.embeddings.embed_documents(queries), k) if queries else []
+
+    async def amatch_chunks(self, queries, k):
+        """Async variant of match_chunks"""
+        return self._top_chunks(await self.async_embeddings.aembed_documents(queries), k) if queries else []
+
+
+def group_skills(skills):
+    """Split skills into groups that each fit in one scoring prompt"""
+    groups = []
+    current = []
+    current_chars = 0
+    for skill in skills:
+        skill_chars = len(skill) + 8
+        if current and (len(current) >= SKILL_BATCH_SIZE or current_chars + skill_chars > SKILL_BATCH_MAX_SKILL_CHARS):
+            groups.append(current)
+            current = []
+            current_chars = 0
+        current.append(skill)
+        current_chars += skill_chars
+    if current:
+        groups.append(current)
+    return groups
+
+
+def skill_group_query(skills):
+    """Retrieval query used to fetch resume context for a group of skills"""
+    return ", ".join(skills)
+
+
+async def ainvoke_llm(llm, prompt, name):
+    """ainvoke inside an llm.<name> span that records prompt and response sizes"""
+    with telemetry.span(f"llm.{name}", prompt_chars=len(prompt)) as span:
+        response = await llm.ainvoke(prompt)
+        span.set(response_chars=len(response.content))
+        return response
+
+
+def format_qa_prompt(docs, question):
+    """Build a RetrievalQA-style prompt from retrieved documents"""
+    context = "\n\n".join(doc.page_content for doc in docs)
+    return QA_PROMPT_TEMPLATE.format(context=context, question=question)
+
 
+def match_question_type(question_type, question_types):
+    """Requested question type named by a generated label, if any"""
+    for requested_type in question_types:
+        if requested_type.lower() in question_type.lower():
+            return requested_type
+    return None
+
+
+def parse_interview_questions(questions_text, question_types):
+    """Parse (question type, question) pairs from a complete interview questions response"""
+    questions = []
+    pattern = r'[("]([^"]+)[",)\s]+[(",\s]+([^"]+)[")\s]+'
+    matches = re.findall(pattern, questions_text, re.DOTALL)
+    
+    for match in matches:
+        if len(match) >= 2:
+            requested_type = match_question_type(match[0].strip(), question_types)
+            if requested_type:
+                questions.append((requested_type, match[1].strip()))
+    
+
+    if not questions:
+        lines = questions_text.split('\n')
+        current_type = None
+        current_question = ""
+        
+        for line in lines:
+            line = line.strip()
+            if any(t.lower() in line.lower() for t in question_types) and not current_question:
+                current_type = next((t for t in question_types if t.lower() in line.lower()), None)
+                if ":" in line:
+                    current_question = line.split(":", 1)[1].strip()
+            elif current_type and line:
+                current_question += " " + line
+            elif current_type and current_question:
+                questions.append((current_type, current_question))
+                current_type = None
+                current_question = ""
+    return questions
 
-from dotenv import load_dotenv
-load_dotenv()
-google_api_key = os.getenv("GOOGLE_API_KEY")
 
 class ResumeAnalysisAgent:
-    def __init__(self, api_key, cutoff_score=75):
+    def __init__(self, api_key, cutoff_score=75, max_concurrency=4, scoring_mode="llm", progress_callback=None):
+        if scoring_mode not in SCORING_MODES:
+            raise ValueError(f"Unknown scoring mode: {scoring_mode}")
         self.api_key = api_key
+        # Called as progress_callback(stage, done, total) while an analysis runs
+        self.progress_callback = progress_callback
         self.cutoff_score = cutoff_score
+        self.max_concurrency = max_concurrency
+        self.scoring_mode = scoring_mode
         self.resume_text = None
+        self.resume_digest = None
+        self.resume_digest_complete = False
         self.rag_vectorstore = None
+        self.resume_index = None
+        self.qa_chain = None
+        self.answered_questions = []
         self.analysis_result = None
         self.jd_text = None
         self.extracted_skills = None
@@ -29,24 +229,15 @@ class ResumeAnalysisAgent:
         self.resume_strengths = []
         self.improvement_suggestions = {}
 
+    def report_progress(self, stage, done=None, total=None):
+        """Pass an analysis stage, with optional done/total counts, to the progress callback"""
+        if self.progress_callback is not None:
+            self.progress_callback(stage, done, total)
+
     def extract_text_from_pdf(self, pdf_file):
-        """Extract text from a PDF file"""
-        try:
-            if hasattr(pdf_file, 'getvalue'): 
-                pdf_data = pdf_file.getvalue()
-                pdf_file_like = io.BytesIO(pdf_data)
-                reader = PyPDF2.PdfReader(pdf_file_like)
-            else: 
-                reader = PyPDF2.PdfReader(pdf_file)
-                
-            text = ""
-            for page in reader.pages:
-                text += page.extract_text()
-            
-            return text
-        except Exception as e:
-            print(f"Error extracting text from PDF: {e}")
-            return ""
+        """Extract text from a PDF file in an isolated worker process"""
+        filename = getattr(pdf_file, 'name', pdf_file)
+        return get_pdf_pool().extract(pdf_file, filename=os.path.basename(str(filename)))
 
     def extract_text_from_txt(self, txt_file):
         """Extract text from a text file"""
@@ -56,60 +247,70 @@ class ResumeAnalysisAgent:
             else: 
                 with open(txt_file, 'r', encoding='utf-8') as f:
                     return f.read()
-        except Exception as e:
-            print(f"Error extracting text from text file: {e}")
-            return ""
+        except (OSError, UnicodeDecodeError) as e:
+            filename = getattr(txt_file, 'name', txt_file)
+            raise DocumentExtractionError("unreadable_text", f"Could not read text file: {e}", os.path.basename(str(filename)))
 
+    @telemetry.traced("extract_text")
     def extract_text_from_file(self, file):
         """Extract text from a file (PDF or TXT)"""
-        if hasattr(file, 'name'):
-            file_extension = file.name.split('.')[-1].lower()
-        else:
-            file_extension = file.split('.')[-1].lower()
+        filename = file.name if hasattr(file, 'name') else file
+        file_extension = filename.split('.')[-1].lower()
             
         if file_extension == 'pdf':
             return self.extract_text_from_pdf(file)
         elif file_extension == 'txt':
             return self.extract_text_from_txt(file)
         else:
-            print(f"Unsupported file extension: {file_extension}")
-            return ""
+            raise DocumentExtractionError("unsupported_type", f"Unsupported file extension: {file_extension}", os.path.basename(filename))
         
 
-    def create_rag_vector_store(self, text):
-        """Create a vector store for RAG"""
-   
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=200,
-            length_function=len,
-        )
-        chunks = text_splitter.split_text(text)
-        
-   
-        embeddings = GoogleGenerativeAIEmbeddings(
-            model="models/embedding-001",
-            google_api_key=google_api_key
-        )
-        vectorstore = FAISS.from_texts(chunks, embeddings)
-        return vectorstore
-    
-
-
-    def create_vector_store(self, text):
-        """Create a simpler vector store for skill analysis"""
-     
-        embeddings = GoogleGenerativeAIEmbeddings(
-            model="models/embedding-001",
-            google_api_key=google_api_key
-        )
-        vectorstore = FAISS.from_texts([text], embeddings)
-        return vectorstore
-
-    def analyze_skill(self, qa_chain, skill):
-        """Analyze a skill in the resume"""
-        query = f"On a scale of 0-10, how clearly does the candidate mention proficiency in {skill}? Provide a numeric rating first, followed by reasoning."
-        response = qa_chain.run(query)
+    def get_embeddings(self):
+        """Embedding model backed by the persistent embedding cache"""
+        return get_embeddings()
+
+    def get_async_embeddings(self):
+        """Embedding model for aembed calls on the running event loop"""
+        return get_async_embeddings()
+
+    def create_resume_index(self, text):
+        """Create the chunked vector index for a resume"""
+        return ResumeIndex.build(text, self.get_embeddings())
+
+    def set_resume_index(self, resume_index):
+        self.resume_index = resume_index
+        self.rag_vectorstore = resume_index.vectorstore
+        # Q&A state belongs to the previous resume
+        self.qa_chain = None
+        self.answered_questions = []
+
+    def get_qa_chain(self):
+        """RetrievalQA chain over the current resume, built once per analyzed resume"""
+        if self.qa_chain is None:
+            from langchain.chains import RetrievalQA
+
+            self.qa_chain = RetrievalQA.from_chain_type(
+                llm = get_llm(priority="interactive"),
+                chain_type="stuff",  
+                retriever=self.resume_index.as_retriever(k=QA_CONTEXT_DOCS),
+                return_source_documents=False,
+            )
+        return self.qa_chain
+
+    def get_resume_index(self, text):
+        """Return the index for this resume text, building it only if the text changed"""
+        if self.resume_index is None or self.resume_index.text != text:
+            self.set_resume_index(self.create_resume_index(text))
+        return self.resume_index
+
+    async def aget_resume_index(self, text):
+        """Async variant of get_resume_index"""
+        if self.resume_index is None or self.resume_index.text != text:
+            self.set_resume_index(await ResumeIndex.abuild(text, self.get_embeddings(), self.get_async_embeddings()))
+        return self.resume_index
+
+    def parse_skill_response(self, skill, response):
+        """Parse a single-skill rating response into (skill, score, reasoning)"""
         match = re.search(r"(\d{1,2})", response)
         score = int(match.group(1)) if match else 0
         
@@ -118,77 +319,181 @@ class ResumeAnalysisAgent:
         
     
         return skill, min(score, 10), reasoning
-    
+
+    async def aanalyze_skill(self, resume_index, llm, skill):
+        """Analyze a skill in the resume"""
+        query = f"On a scale of 0-10, how clearly does the candidate mention proficiency in {skill}? Provide a numeric rating first, followed by reasoning."
+        docs = await resume_index.asimilarity_search(query, k=SKILL_CONTEXT_DOCS)
+        response = await ainvoke_llm(llm, format_qa_prompt(docs, query), "skill")
+        with telemetry.span("parse.skill"):
+            return self.parse_skill_response(skill, response.content)
+
+    def parse_skill_batch_response(self, response, skills):
+        """Parse a batched scoring response into (skill, score, reasoning) tuples"""
+        match = re.search(r'\[.*\]', response, re.DOTALL)
+        if not match:
+            return {}
+
+        try:
+            items = json.loads(match.group(0))
+        except json.JSONDecodeError:
+            return {}
+
+        by_name = {skill.lower().strip(): skill for skill in skills}
+        parsed = {}
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            skill = by_name.get(str(item.get("skill", "")).lower().strip())
+            if not skill:
+                continue
+            try:
+                score = int(float(item.get("score", 0)))
+            except (TypeError, ValueError):
+                score = 0
+            parsed[skill] = (skill, max(0, min(score, 10)), str(item.get("reasoning", "")).strip())
+        return parsed
+
+    async def aanalyze_skills_batch(self, resume_index, llm, skills):
+        """Score a group of skills with a single LLM call over shared resume context"""
+        docs = await resume_index.asimilarity_search(skill_group_query(skills), k=SKILL_BATCH_CONTEXT_DOCS)
+        context = "\n\n".join(doc.page_content for doc in docs)
+
+        skill_list = "\n".join(f"- {skill}" for skill in skills)
+        prompt = f"""
+        You are evaluating a resume. For each skill below, rate on a scale of 0-10 how clearly
+        the candidate mentions proficiency in that skill, based only on the resume content.
+
+        Skills:
+        {skill_list}
+
+        Resume Content:
+        {context}
+
+        Return a JSON array with exactly one object per skill, in this format:
+        [
+            {{"skill": "Skill name exactly as listed", "score": 0, "reasoning": "One or two sentences of reasoning"}}
+        ]
+
+        Return only valid JSON, no other text.
+        """
+
+        response = await ainvoke_llm(llm, prompt, "skill_batch")
+        with telemetry.span("parse.skill_batch", skills=len(skills)) as span:
+            parsed = self.parse_skill_batch_response(response.content, skills)
+            span.set(parsed=len(parsed))
+
+        # Fall back to a single-skill query when the batch response omits a skill
+        fallback = await asyncio.gather(*(
+            self.aanalyze_skill(resume_index, llm, skill) for skill in skills if skill not in parsed
+        ))
+        parsed.update((result[0], result) for result in fallback)
+        return [parsed[skill] for skill in skills]
+
 
 
     def analyze_resume_weaknesses(self):
         """Analyze specific weaknesses in the resume based on missing skills"""
+        return run_sync(self.aanalyze_resume_weaknesses())
+
+    async def aanalyze_skill_weakness(self, llm, skill, resume_context=None):
+        """Analyze why the resume is weak in one missing skill"""
+        if resume_context is None:
+            resume_context = (await self.aresume_contexts([skill], WEAKNESS_CONTEXT_DOCS))[0]
+        prompt = f"""
+        Analyze why the resume is weak in demonstrating proficiency in "{skill}".
+        
+        For your analysis, consider:
+        1. What's missing from the resume regarding this skill?
+        2. How could it be improved with specific examples?
+        3. What specific action items would make this skill stand out?
+        
+        Resume Content:
+        {resume_context}
+        
+        Provide your response in this JSON format:
+        {{
+            "weakness": "A concise description of what's missing or problematic (1-2 sentences)",
+            "improvement_suggestions": [
+                "Specific suggestion 1",
+                "Specific suggestion 2",
+                "Specific suggestion 3"
+            ],
+            "example_addition": "A specific bullet point that could be added to showcase this skill"
+        }}
+        
+        Return only valid JSON, no other text.
+        """
+        
+        response = await ainvoke_llm(llm, prompt, "weakness")
+        weakness_content = response.content.strip()
+        score = self.analysis_result.get("skill_scores", {}).get(skill, 0)
+        
+
+        try:
+            with telemetry.span("parse.weakness"):
+                weakness_data = json.loads(weakness_content)
+        except json.JSONDecodeError:
+            return {
+                "skill": skill,
+                "score": score,
+                "detail": weakness_content[:200]  # Truncate if it's not proper JSON
+            }
+
+        return {
+            "skill": skill,
+            "score": score,
+            "detail": weakness_data.get("weakness", "No specific details provided."),
+            "suggestions": weakness_data.get("improvement_suggestions", []),
+            "example": weakness_data.get("example_addition", "")
+        }
+
+    @telemetry.traced("weaknesses")
+    async def aanalyze_resume_weaknesses(self):
+        """Async variant of analyze_resume_weaknesses; skills are analyzed concurrently"""
         if not self.resume_text or not self.extracted_skills or not self.analysis_result:
             return []
         
-        weaknesses = []
-        
-        for skill in self.analysis_result.get("missing_skills", []):
+        llm = get_async_llm()
+        missing_skills = self.analysis_result.get("missing_skills", [])
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        # Excerpts for every missing skill come from a single embedding call
+        resume_contexts = await self.aresume_contexts(missing_skills, WEAKNESS_CONTEXT_DOCS)
 
-            llm = ChatGoogleGenerativeAI(
-    model="gemini-2.0-flash-lite", # Recommended model
-    google_api_key=google_api_key, # Can often be omitted if env var is set
-    temperature=0.2, # Example parameter
-    convert_system_message_to_human=True # Often helpful for Gemini compatibility
-)
-            prompt = f"""
-            Analyze why the resume is weak in demonstrating proficiency in "{skill}".
-            
-            For your analysis, consider:
-            1. What's missing from the resume regarding this skill?
-            2. How could it be improved with specific examples?
-            3. What specific action items would make this skill stand out?
-            
-            Resume Content:
-            {self.resume_text[:3000]}...
-            
-            Provide your response in this JSON format:
-            {{
-                "weakness": "A concise description of what's missing or problematic (1-2 sentences)",
-                "improvement_suggestions": [
-                    "Specific suggestion 1",
-                    "Specific suggestion 2",
-                    "Specific suggestion 3"
-                ],
-                "example_addition": "A specific bullet point that could be added to showcase this skill"
-            }}
-            
-            Return only valid JSON, no other text.
-            """
-            
-            response = llm.invoke(prompt)
-            weakness_content = response.content.strip()
-            
-    
+        finished = 0
+        self.report_progress("weaknesses", finished, len(missing_skills))
+
+        async def analyze(skill, resume_context):
+            nonlocal finished
             try:
-                weakness_data = json.loads(weakness_content)
-                
-                weakness_detail = {
+                async with semaphore:
+                    return await self.aanalyze_skill_weakness(llm, skill, resume_context)
+            finally:
+                finished += 1
+                self.report_progress("weaknesses", finished, len(missing_skills))
+
+        # gather keeps the missing_skills order; a failed skill does not cancel the others
+        results = await asyncio.gather(
+            *(analyze(skill, resume_context) for skill, resume_context in zip(missing_skills, resume_contexts)),
+            return_exceptions=True,
+        )
+
+        weaknesses = []
+        for skill, result in zip(missing_skills, results):
+            if isinstance(result, Exception):
+                logger.warning("Error analyzing weakness for %s: %s", skill, result)
+                result = {
                     "skill": skill,
                     "score": self.analysis_result.get("skill_scores", {}).get(skill, 0),
-                    "detail": weakness_data.get("weakness", "No specific details provided."),
-                    "suggestions": weakness_data.get("improvement_suggestions", []),
-                    "example": weakness_data.get("example_addition", "")
+                    "detail": "No specific details provided."
                 }
-                
-                weaknesses.append(weakness_detail)
+            weaknesses.append(result)
 
+            if "suggestions" in result:
                 self.improvement_suggestions[skill] = {
-                    "suggestions": weakness_data.get("improvement_suggestions", []),
-                    "example": weakness_data.get("example_addition", "")
+                    "suggestions": result["suggestions"],
+                    "example": result["example"]
                 }
-            except json.JSONDecodeError:
-             
-                weaknesses.append({
-                    "skill": skill,
-                    "score": self.analysis_result.get("skill_scores", {}).get(skill, 0),
-                    "detail": weakness_content[:200]  # Truncate if it's not proper JSON
-                })
             
         self.resume_weaknesses = weaknesses
         return weaknesses
@@ -198,14 +503,49 @@ class ResumeAnalysisAgent:
 
     def extract_skills_from_jd(self, jd_text):
         """Extract skills from a job description"""
+        return run_sync(self.aextract_skills_from_jd(jd_text))
+
+    def parse_skills_list(self, skills_text):
+        """Parse the skill list out of an LLM response"""
+        match = re.search(r'\[(.*?)\]', skills_text, re.DOTALL)
+        if match:
+            skills_text = match.group(0)
+        
+
         try:
+            skills_list = eval(skills_text)
+            if isinstance(skills_list, list):
+                return skills_list
+        except:
+            pass
+        
+     
+        skills = []
+        for line in skills_text.split('\n'):
+            line = line.strip()
+            if line.startswith('- ') or line.startswith('* '):
+                skill = line[2:].strip()
+                if skill:
+                    skills.append(skill)
+            elif line.startswith('"') and line.endswith('"'):
+                skill = line.strip('"')
+                if skill:
+                    skills.append(skill)
+        
+        return skills
+
+    @telemetry.traced("jd_skills")
+    async def aextract_skills_from_jd(self, jd_text):
+        """Async variant of extract_skills_from_jd; results are cached per JD"""
+        try:
+            cache = get_jd_skills_cache()
+            cache_key = content_hash(LLM_MODEL, normalize_jd_text(jd_text))
+            cached = await asyncio.to_thread(cache.get, cache_key)
+            telemetry.record_cache("jd_skills", hits=int(cached is not None), misses=int(cached is None))
+            if cached is not None:
+                return json.loads(cached)
  
-            llm = ChatGoogleGenerativeAI(
-    model="gemini-2.0-flash-lite", # Recommended model
-    google_api_key=google_api_key, # Can often be omitted if env var is set
-    temperature=0.2, # Example parameter
-    convert_system_message_to_human=True # Often helpful for Gemini compatibility
-)
+            llm = get_async_llm()
             prompt = f"""
             Extract a comprehensive list of technical skills, technologies, and competencies required from this job description. 
             Format the output as a Python list of strings. Only include the list, nothing else.
@@ -214,64 +554,91 @@ class ResumeAnalysisAgent:
             {jd_text}
             """
             
-            response = llm.invoke(prompt)
-            skills_text = response.content
-            
-      
-            match = re.search(r'\[(.*?)\]', skills_text, re.DOTALL)
-            if match:
-                skills_text = match.group(0)
-            
+            response = await ainvoke_llm(llm, prompt, "jd_skills")
+            with telemetry.span("parse.jd_skills"):
+                skills = self.parse_skills_list(response.content)
 
-            try:
-                skills_list = eval(skills_text)
-                if isinstance(skills_list, list):
-                    return skills_list
-            except:
-                pass
-            
-         
-            skills = []
-            for line in skills_text.split('\n'):
-                line = line.strip()
-                if line.startswith('- ') or line.startswith('* '):
-                    skill = line[2:].strip()
-                    if skill:
-                        skills.append(skill)
-                elif line.startswith('"') and line.endswith('"'):
-                    skill = line.strip('"')
-                    if skill:
-                        skills.append(skill)
-            
+            if skills:
+                await asyncio.to_thread(cache.set, cache_key, json.dumps(skills).encode("utf-8"))
             return skills
-        except Exception as e:
-            print(f"Error extracting skills from job description: {e}")
+        except Exception:
+            logger.exception("Error extracting skills from job description")
             return []
         
 
-    def semantic_skill_analysis(self, resume_text, skills):
+    def semantic_skill_analysis(self, resume_text, skills, batch=True, prescore=True):
         """Analyze skills semantically"""
-        vectorstore = self.create_vector_store(resume_text)
-        retriever = vectorstore.as_retriever()
-        qa_chain = RetrievalQA.from_chain_type(
-            llm = ChatGoogleGenerativeAI(
-    model="gemini-2.0-flash-lite", # Recommended model
-    google_api_key=google_api_key, # Can often be omitted if env var is set
-    temperature=0.2, # Example parameter
-    convert_system_message_to_human=True # Often helpful for Gemini compatibility
-),
-            retriever=retriever,
-            return_source_documents=False
-        )
+        return run_sync(self.asemantic_skill_analysis(resume_text, skills, batch=batch, prescore=prescore))
+
+    async def aembedding_skill_scores(self, resume_index, skills):
+        """Score skills from cosine similarity between skill and resume chunk embeddings"""
+        if not skills:
+            return []
+        skill_vectors = np.asarray(await resume_index.async_embeddings.aembed_documents(skills), dtype=np.float32)
+        chunk_vectors = np.asarray(resume_index.chunk_embeddings, dtype=np.float32)
+
+        skill_vectors /= np.linalg.norm(skill_vectors, axis=1, keepdims=True) + 1e-12
+        chunk_vectors /= np.linalg.norm(chunk_vectors, axis=1, keepdims=True) + 1e-12
+        # (skills x chunks) similarity matrix; each skill is judged by its best matching chunk
+        best = (skill_vectors @ chunk_vectors.T).max(axis=1)
+
+        low, high = EMBEDDING_SCORE_THRESHOLDS
+        scores = np.clip(np.rint((best - low) / (high - low) * 10), 0, 10).astype(int)
+        return [
+            (skill, int(score), f"Closest resume passage has a cosine similarity of {similarity:.2f} to {skill}.")
+            for skill, score, similarity in zip(skills, scores, best)
+        ]
+
+    @telemetry.traced("skill_scoring")
+    async def asemantic_skill_analysis(self, resume_text, skills, batch=True, prescore=True):
+        """Async variant of semantic_skill_analysis"""
+        if not skills:
+            raise ValueError("No skills to analyze the resume against")
+        # Skills that are clearly present or absent in the text are scored without the LLM
+        with telemetry.span("prescore", skills=len(skills)) as span:
+            if prescore:
+                scored, ambiguous = await asyncio.to_thread(prescore_skills, resume_text, skills)
+            else:
+                scored, ambiguous = {}, list(dict.fromkeys(skills))
+            span.set(lexical=len(scored), ambiguous=len(ambiguous))
+
+        resume_index = await self.aget_resume_index(resume_text)
+        llm = get_async_llm()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        finished = len(skills) - len(ambiguous)
+        self.report_progress("scoring", finished, len(skills))
+
+        async def limited(coro, skill_count):
+            nonlocal finished
+            async with semaphore:
+                result = await coro
+            finished += skill_count
+            self.report_progress("scoring", finished, len(skills))
+            return result
+
+        if self.scoring_mode == "embedding":
+            # LLM-free triage: scores come straight from the vectors
+            llm_results = await limited(self.aembedding_skill_scores(resume_index, ambiguous), len(ambiguous))
+        elif batch:
+            # One prompt per group of skills instead of one retrieval QA run per skill
+            group_results = await asyncio.gather(*(
+                limited(self.aanalyze_skills_batch(resume_index, llm, group), len(group))
+                for group in group_skills(ambiguous)
+            ))
+            llm_results = [result for group in group_results for result in group]
+        else:
+            llm_results = await asyncio.gather(*(
+                limited(self.aanalyze_skill(resume_index, llm, skill), 1) for skill in ambiguous
+            ))
+
+        scored.update((result[0], result) for result in llm_results)
+        results = [scored[skill] for skill in skills]
 
         skill_scores = {}
         skill_reasoning = {}
         missing_skills = []
         total_score = 0
 
-        with ThreadPoolExecutor(max_workers=2) as executor:
-            results = list(executor.map(lambda skill: self.analyze_skill(qa_chain, skill), skills))
-
         for skill, score, reasoning in results:
             skill_scores[skill] = score
             skill_reasoning[skill] = reasoning
@@ -291,6 +658,7 @@ class ResumeAnalysisAgent:
 
         return {
             "overall_score": overall_score,
+            "cutoff_score": self.cutoff_score,
             "skill_scores": skill_scores,
             "skill_reasoning": skill_reasoning,
             "selected": selected,
@@ -303,79 +671,240 @@ class ResumeAnalysisAgent:
 
     def analyze_resume(self, resume_file, role_requirements=None, custom_jd=None):
         """Analyze a resume against role requirements or a custom JD"""
-        self.resume_text = self.extract_text_from_file(resume_file)
+        return run_sync(self.aanalyze_resume(resume_file, role_requirements, custom_jd))
+
+    async def _aload_resume_text(self, resume_text):
+        self.resume_text = resume_text
+        with telemetry.span("digest", chars=len(resume_text)) as span:
+            self.resume_digest, self.resume_digest_complete = await asyncio.to_thread(build_resume_digest, resume_text)
+            span.set(digest_chars=len(self.resume_digest))
+        self.report_progress("embedding")
         
        
         with tempfile.NamedTemporaryFile(delete=False, suffix='.txt', mode='w', encoding='utf-8') as tmp:
             tmp.write(self.resume_text)
             self.resume_file_path = tmp.name
      
-        self.rag_vectorstore = self.create_rag_vector_store(self.resume_text)
-        
-   
-        if custom_jd:
-            self.jd_text = self.extract_text_from_file(custom_jd)
-            self.extracted_skills = self.extract_skills_from_jd(self.jd_text)
-            
-        
-            self.analysis_result = self.semantic_skill_analysis(self.resume_text, self.extracted_skills)
-    
-        elif role_requirements:
-            self.extracted_skills = role_requirements
-            
- 
-            self.analysis_result = self.semantic_skill_analysis(self.resume_text, role_requirements)
+        await self.aget_resume_index(self.resume_text)
+
+    async def _aprepare_skills(self, role_requirements, jd_text):
+        if jd_text:
+            self.jd_text = jd_text
+            return await self.aextract_skills_from_jd(jd_text)
+        return role_requirements
+
+    async def _aevaluate(self, skills, analyze_weaknesses=True):
+        if skills:
+            self.extracted_skills = skills
+            self.analysis_result = await self.asemantic_skill_analysis(self.resume_text, skills)
             
     
-        if self.analysis_result and "missing_skills" in self.analysis_result and self.analysis_result["missing_skills"]:
-            self.analyze_resume_weaknesses()
+        if analyze_weaknesses and self.analysis_result and "missing_skills" in self.analysis_result and self.analysis_result["missing_skills"]:
+            await self.aanalyze_resume_weaknesses()
      
             self.analysis_result["detailed_weaknesses"] = self.resume_weaknesses
         
         return self.analysis_result
 
+    def result_cache_key(self, resume_text, skills=None, jd_text=None, analyze_weaknesses=True):
+        """Key of an analysis result: resume, skills or JD, models, scoring mode and cutoff"""
+        if jd_text:
+            target = "jd:" + content_hash(normalize_jd_text(jd_text))
+        else:
+            target = "skills:" + json.dumps(list(skills or []))
+        return content_hash(
+            LLM_MODEL, EMBEDDING_MODEL, self.scoring_mode, str(self.cutoff_score), str(bool(analyze_weaknesses)),
+            content_hash(resume_text), target,
+        )
+
+    async def _arestore_result(self, resume_text, jd_text, cached):
+        # Rebuilds the Q&A and interview state; the index comes from cached embeddings
+        self.jd_text = jd_text
+        await self._aload_resume_text(resume_text)
+        self.extracted_skills = cached["skills"]
+        self.analysis_result = cached["result"]
+        self.resume_strengths = self.analysis_result.get("strengths", [])
+        self.resume_weaknesses = self.analysis_result.get("detailed_weaknesses", [])
+        for weakness in self.resume_weaknesses:
+            if "suggestions" in weakness:
+                self.improvement_suggestions[weakness["skill"]] = {
+                    "suggestions": weakness["suggestions"],
+                    "example": weakness["example"]
+                }
+        return self.analysis_result
+
+    async def _astore_result(self, cache_key, result):
+        if result:
+            result["analysis_id"] = cache_key
+            # The texts let any process rebuild the Q&A and interview state from the analysis ID alone
+            cached = {"skills": self.extracted_skills, "result": result, "resume_text": self.resume_text,
+                      "jd_text": self.jd_text}
+            await asyncio.to_thread(get_result_cache().set, cache_key, json.dumps(cached).encode("utf-8"))
+        return result
+
+    async def aanalyze_resume(self, resume_file, role_requirements=None, custom_jd=None):
+        """Async variant of analyze_resume; independent stages run concurrently"""
+        with telemetry.trace() as trace:
+            with telemetry.span("analyze_resume"):
+                result = await self._aanalyze_file(resume_file, role_requirements, custom_jd)
+        return telemetry.attach_trace(result, trace)
+
+    def load_analysis(self, analysis_id):
+        """Restore a cached analysis by its ID; None if unknown or expired"""
+        return run_sync(self.aload_analysis(analysis_id))
+
+    async def aload_analysis(self, analysis_id):
+        """Restore a cached analysis by its ID for Q&A and interview questions; None if unknown or expired"""
+        cached = await self._acached_result(analysis_id)
+        if cached is None or "resume_text" not in cached:
+            return None
+        return await self._arestore_result(cached["resume_text"], cached.get("jd_text"), cached)
+
+    async def _acached_result(self, cache_key):
+        cached = await asyncio.to_thread(get_result_cache().get, cache_key)
+        telemetry.record_cache("results", hits=int(cached is not None), misses=int(cached is None))
+        return json.loads(cached) if cached is not None else None
+
+    async def _aanalyze_file(self, resume_file, role_requirements, custom_jd):
+        self.report_progress("extracting")
+        resume_text, jd_text = await asyncio.gather(
+            asyncio.to_thread(self.extract_text_from_file, resume_file),
+            asyncio.to_thread(self.extract_text_from_file, custom_jd) if custom_jd else asyncio.sleep(0),
+        )
+        if not resume_text.strip():
+            filename = os.path.basename(str(getattr(resume_file, "name", resume_file)))
+            raise DocumentExtractionError("empty_document", "No text could be extracted", filename)
+        cache_key = self.result_cache_key(resume_text, role_requirements, jd_text)
+        cached = await self._acached_result(cache_key)
+        if cached is not None:
+            return await self._arestore_result(resume_text, jd_text, cached)
+
+        # The index build and JD skill extraction do not depend on each other
+        _, skills = await asyncio.gather(
+            self._aload_resume_text(resume_text),
+            self._aprepare_skills(role_requirements, jd_text),
+        )
+        return await self._astore_result(cache_key, await self._aevaluate(skills))
+
+    async def aanalyze_resume_text(self, resume_text, skills, analyze_weaknesses=True):
+        """Analyze already extracted resume text against a known skill list"""
+        with telemetry.trace() as trace:
+            with telemetry.span("analyze_resume"):
+                result = await self._aanalyze_text(resume_text, skills, analyze_weaknesses)
+        return telemetry.attach_trace(result, trace)
+
+    async def _aanalyze_text(self, resume_text, skills, analyze_weaknesses):
+        cache_key = self.result_cache_key(resume_text, skills, analyze_weaknesses=analyze_weaknesses)
+        cached = await self._acached_result(cache_key)
+        if cached is not None:
+            return await self._arestore_result(resume_text, None, cached)
+
+        await self._aload_resume_text(resume_text)
+        return await self._astore_result(cache_key, await self._aevaluate(skills, analyze_weaknesses))
+
+    def add_to_talent_pool(self, talent_pool, candidate_id=None, name=None):
+        """Add the analyzed resume's chunks to a persistent talent pool, reusing its embeddings"""
+        if not self.resume_index or not self.analysis_result:
+            return None
+        candidate_id = candidate_id or content_hash(self.resume_text)
+        talent_pool.add_candidate(
+            candidate_id,
+            self.resume_index.chunks,
+            self.resume_index.chunk_embeddings,
+            name=name,
+            metadata={
+                "overall_score": self.analysis_result.get("overall_score"),
+                "selected": self.analysis_result.get("selected"),
+                "strengths": self.analysis_result.get("strengths", []),
+                "missing_skills": self.analysis_result.get("missing_skills", []),
+            },
+        )
+        return candidate_id
+
+    def _lookup_answer(self, question):
+        """Cached answer for a question, plus what is needed to store a new one"""
+        resume_hash = content_hash(self.resume_text)
+        normalized_question = normalize_question(question)
+        cache_key = content_hash(LLM_MODEL, resume_hash, normalized_question)
+        cached = get_answer_cache().get(cache_key)
+        telemetry.record_cache("answers", hits=int(cached is not None), misses=int(cached is None))
+        if cached is not None:
+            return cached.decode("utf-8"), cache_key, None
+
+        question_embedding = None
+        if QA_SEMANTIC_CACHE_THRESHOLD:
+            # Near-duplicate wording of a question already answered for this resume
+            question_embedding = np.asarray(self.get_embeddings().embed_query(normalized_question), dtype=np.float32)
+            question_embedding /= np.linalg.norm(question_embedding) + 1e-12
+            for previous_embedding, previous_answer in self.answered_questions:
+                if float(previous_embedding @ question_embedding) >= QA_SEMANTIC_CACHE_THRESHOLD:
+                    return previous_answer, cache_key, None
+        return None, cache_key, question_embedding
+
+    def _store_answer(self, cache_key, question_embedding, answer):
+        get_answer_cache().set(cache_key, answer.encode("utf-8"))
+        if question_embedding is not None:
+            self.answered_questions.append((question_embedding, answer))
+
     def ask_question(self, question):
         """Ask a question about the resume"""
-        if not self.rag_vectorstore or not self.resume_text:
+        if not self.resume_index or not self.resume_text:
             return "Please analyze a resume first."
         
-        retriever = self.rag_vectorstore.as_retriever(
-            search_kwargs={"k": 3}  
-        )
+        answer, cache_key, question_embedding = self._lookup_answer(question)
+        if answer is not None:
+            return answer
         
-        qa_chain = RetrievalQA.from_chain_type(
-            llm = ChatGoogleGenerativeAI(
-    model="gemini-2.0-flash-lite", # Recommended model
-    google_api_key=google_api_key, # Can often be omitted if env var is set
-    temperature=0.2, # Example parameter
-    convert_system_message_to_human=True # Often helpful for Gemini compatibility
-),
-            chain_type="stuff",  
-            retriever=retriever,
-            return_source_documents=False,
-        )
-        
-        response = qa_chain.run(question)
+        with telemetry.span("llm.qa_chain") as span:
+            response = self.get_qa_chain().run(question)
+            span.set(response_chars=len(response))
+        self._store_answer(cache_key, question_embedding, response)
         return response
-    
 
-    def generate_interview_questions(self, question_types, difficulty, num_questions):
-        """Generate interview questions based on the resume"""
-        if not self.resume_text or not self.extracted_skills:
-            return []
-        
-        try:
-            llm = ChatGoogleGenerativeAI(
-    model="gemini-2.0-flash-lite", # Recommended model
-    google_api_key=google_api_key, # Can often be omitted if env var is set
-    temperature=0.2, # Example parameter
-    convert_system_message_to_human=True # Often helpful for Gemini compatibility
-)
-            
-        
-            context = f"""
+    def stream_answer(self, question):
+        """Yield the answer to a question about the resume as the LLM generates it"""
+        if not self.resume_index or not self.resume_text:
+            yield "Please analyze a resume first."
+            return
+
+        answer, cache_key, question_embedding = self._lookup_answer(question)
+        if answer is not None:
+            yield answer
+            return
+
+        # Same retrieval and prompt as the Q&A chain, streamed instead of awaited
+        docs = self.resume_index.similarity_search(question, k=QA_CONTEXT_DOCS)
+        parts = []
+        prompt = format_qa_prompt(docs, question)
+        with telemetry.span("llm.qa_stream", prompt_chars=len(prompt)) as span:
+            for chunk in get_llm(priority="interactive").stream(prompt):
+                if chunk.content:
+                    parts.append(chunk.content)
+                    yield chunk.content
+            span.set(response_chars=sum(len(part) for part in parts))
+        self._store_answer(cache_key, question_embedding, "".join(parts))
+
+    def resume_contexts(self, queries, k):
+        """For each query, the resume digest plus the lines of its top k chunks that the digest leaves out"""
+        if self.resume_digest_complete:
+            return [self.resume_digest for _ in queries]
+        return [format_resume_context(self.resume_digest, chunks) for chunks in self.resume_index.match_chunks(queries, k)]
+
+    async def aresume_contexts(self, queries, k):
+        """Async variant of resume_contexts"""
+        if self.resume_digest_complete:
+            return [self.resume_digest for _ in queries]
+        return [
+            format_resume_context(self.resume_digest, chunks)
+            for chunks in await self.resume_index.amatch_chunks(queries, k)
+        ]
+
+    def interview_prompt(self, question_types, difficulty, num_questions):
+        """Prompt asking the LLM for personalized interview questions"""
+        resume_context = self.resume_contexts([skill_group_query(self.extracted_skills)], INTERVIEW_CONTEXT_DOCS)[0]
+        context = f"""
             Resume Content:
-            {self.resume_text[:2000]}...
+            {resume_context}
             
             Skills to focus on: {', '.join(self.extracted_skills)}
             
@@ -384,7 +913,7 @@ class ResumeAnalysisAgent:
             Areas for improvement: {', '.join(self.analysis_result.get('missing_skills', []))}
             """
             
-            prompt = f"""
+        return f"""
             Generate {num_questions} personalized {difficulty.lower()} level interview questions for this candidate 
             based on their resume and skills. Include only the following question types: {', '.join(question_types)}.
             
@@ -398,52 +927,39 @@ class ResumeAnalysisAgent:
             Format the response as a list of tuples with the question type and the question itself.
             Each tuple should be in the format: ("Question Type", "Full Question Text")
             """
-            
-            response = llm.invoke(prompt)
-            questions_text = response.content
-            
-      
-            questions = []
-            pattern = r'[("]([^"]+)[",)\s]+[(",\s]+([^"]+)[")\s]+'
-            matches = re.findall(pattern, questions_text, re.DOTALL)
-            
-            for match in matches:
-                if len(match) >= 2:
-                    question_type = match[0].strip()
-                    question = match[1].strip()
-                    
-     
-                    for requested_type in question_types:
-                        if requested_type.lower() in question_type.lower():
-                            questions.append((requested_type, question))
-                            break
-            
 
-            if not questions:
-                lines = questions_text.split('\n')
-                current_type = None
-                current_question = ""
-                
-                for line in lines:
-                    line = line.strip()
-                    if any(t.lower() in line.lower() for t in question_types) and not current_question:
-                        current_type = next((t for t in question_types if t.lower() in line.lower()), None)
-                        if ":" in line:
-                            current_question = line.split(":", 1)[1].strip()
-                    elif current_type and line:
-                        current_question += " " + line
-                    elif current_type and current_question:
-                        questions.append((current_type, current_question))
-                        current_type = None
-                        current_question = ""
-
-            questions = questions[:num_questions]
-            
-            return questions
-        
-        except Exception as e:
-            print(f"Error generating interview questions: {e}")
+    def generate_interview_questions(self, question_types, difficulty, num_questions):
+        """Generate interview questions based on the resume"""
+        try:
+            return list(self.stream_interview_questions(question_types, difficulty, num_questions))
+        except Exception:
+            logger.exception("Error generating interview questions")
             return []
+
+    def stream_interview_questions(self, question_types, difficulty, num_questions):
+        """Yield (question type, question) pairs as soon as each one is complete in the LLM output"""
+        if not self.resume_text or not self.extracted_skills:
+            return
+
+        questions_text = ""
+        position = 0
+        count = 0
+        prompt = self.interview_prompt(question_types, difficulty, num_questions)
+        with telemetry.span("llm.interview", prompt_chars=len(prompt)) as span:
+            for chunk in get_llm(priority="interactive").stream(prompt):
+                questions_text += chunk.content
+                # Only tuples whose closing parenthesis has arrived are parsed
+                for match in COMPLETE_QUESTION_PATTERN.finditer(questions_text, position):
+                    position = match.end()
+                    requested_type = match_question_type(match.group(1), question_types)
+                    if requested_type and count < num_questions:
+                        count += 1
+                        yield requested_type, match.group(2).strip()
+            span.set(response_chars=len(questions_text))
+
+        if not count:
+            # The model ignored the tuple format; fall back to the lenient parser
+            yield from parse_interview_questions(questions_text, question_types)[:num_questions]
         
     
 
@@ -456,4 +972,4 @@ class ResumeAnalysisAgent:
             if hasattr(self, 'improved_resume_path') and os.path.exists(self.improved_resume_path):
                 os.unlink(self.improved_resume_path)
         except Exception as e:
-            print(f"Error cleaning up temporary files: {e}")
\ No newline at end of file
+            logger.warning("Error cleaning up temporary files: %s", e)
\ No newline at end of file
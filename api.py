@@ -0,0 +1,235 @@
+import asyncio
+import contextlib
+import io
+import json
+import os
+import re
+from typing import List, Literal, Optional
+
+from fastapi import FastAPI, File, Form, HTTPException, Request, UploadFile
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+from pydantic import BaseModel, Field
+
+import reports
+import telemetry
+from agents import ResumeAnalysisAgent
+from cache import get_result_cache
+from pdf_extraction import DocumentExtractionError
+from roles import ROLE_REQUIREMENTS
+
+# Analyses run at once per process, and analyses allowed to wait for a slot before requests get a 503
+API_ANALYSIS_WORKERS = int(os.getenv("API_ANALYSIS_WORKERS", "4"))
+API_MAX_QUEUED_ANALYSES = int(os.getenv("API_MAX_QUEUED_ANALYSES", "16"))
+
+# Request bodies larger than this are refused before they are read
+API_MAX_REQUEST_BYTES = int(os.getenv("API_MAX_REQUEST_BYTES", str(12 * 1024 * 1024)))
+API_MAX_UPLOAD_BYTES = int(os.getenv("API_MAX_UPLOAD_BYTES", str(5 * 1024 * 1024)))
+API_MAX_JD_CHARS = 50_000
+API_MAX_QUESTION_CHARS = 1_000
+
+QUESTION_TYPES = ("Basic", "Technical", "Experience", "Scenario", "Coding", "Behavioral")
+UPLOAD_EXTENSIONS = (".pdf", ".txt")
+ANALYSIS_ID_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+app = FastAPI(title="Resume Analysis Service")
+
+_analysis_slots = None
+_waiting_analyses = 0
+
+
+class QuestionRequest(BaseModel):
+    question: str = Field(min_length=1, max_length=API_MAX_QUESTION_CHARS)
+
+
+class InterviewRequest(BaseModel):
+    question_types: List[Literal[QUESTION_TYPES]] = Field(default=["Basic", "Technical"], min_length=1)
+    difficulty: Literal["Easy", "Medium", "Hard"] = "Medium"
+    num_questions: int = Field(default=5, ge=1, le=15)
+
+
+@app.middleware("http")
+async def limit_request_size(request, call_next):
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > API_MAX_REQUEST_BYTES:
+        return JSONResponse({"detail": "Request body too large"}, status_code=413)
+    return await call_next(request)
+
+
+@app.exception_handler(DocumentExtractionError)
+async def document_error_handler(request: Request, exc: DocumentExtractionError):
+    return JSONResponse({"detail": exc.message, "code": exc.code, "filename": exc.filename}, status_code=422)
+
+
+async def read_upload(upload, max_bytes=API_MAX_UPLOAD_BYTES):
+    """Upload as a named BytesIO, as the agent expects from Streamlit uploads"""
+    filename = os.path.basename(upload.filename or "")
+    if not filename.lower().endswith(UPLOAD_EXTENSIONS):
+        raise HTTPException(415, f"Only {', '.join(UPLOAD_EXTENSIONS)} files are supported")
+    data = await upload.read(max_bytes + 1)
+    if len(data) > max_bytes:
+        raise HTTPException(413, f"{filename} is larger than {max_bytes} bytes")
+    document = io.BytesIO(data)
+    document.name = filename
+    return document
+
+
+def get_analysis_slots():
+    # Created on first use inside the server loop: before Python 3.10, asyncio primitives
+    # bind to the loop that is current when they are created
+    global _analysis_slots
+    if _analysis_slots is None:
+        _analysis_slots = asyncio.Semaphore(API_ANALYSIS_WORKERS)
+    return _analysis_slots
+
+
+@contextlib.asynccontextmanager
+async def analysis_slot():
+    """Wait for one of the API_ANALYSIS_WORKERS slots, or fail fast with a 503 when the queue is full"""
+    global _waiting_analyses
+    slots = get_analysis_slots()
+    if slots.locked() and _waiting_analyses >= API_MAX_QUEUED_ANALYSES:
+        raise HTTPException(503, "Too many analyses in progress", headers={"Retry-After": "10"})
+    _waiting_analyses += 1
+    telemetry.gauge("api_queued_analyses", _waiting_analyses)
+    try:
+        await slots.acquire()
+    finally:
+        _waiting_analyses -= 1
+        telemetry.gauge("api_queued_analyses", _waiting_analyses)
+    try:
+        yield
+    finally:
+        slots.release()
+
+
+def check_analysis_id(analysis_id):
+    if not ANALYSIS_ID_PATTERN.match(analysis_id):
+        raise HTTPException(404, "Unknown analysis")
+
+
+async def load_result(analysis_id):
+    """Cached analysis result, without rebuilding the resume index"""
+    check_analysis_id(analysis_id)
+    cached = await asyncio.to_thread(get_result_cache().get, analysis_id)
+    if cached is None:
+        raise HTTPException(404, "Unknown or expired analysis")
+    return json.loads(cached)["result"]
+
+
+async def load_agent(analysis_id):
+    """Fresh agent restored from the shared result cache; handlers keep no state between requests"""
+    check_analysis_id(analysis_id)
+    agent = ResumeAnalysisAgent(api_key=None)
+    if await agent.aload_analysis(analysis_id) is None:
+        agent.cleanup()
+        raise HTTPException(404, "Unknown or expired analysis")
+    return agent
+
+
+@app.get("/health")
+async def health():
+    return {"status": "ok"}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return telemetry.render_metrics()
+
+
+@app.get("/roles")
+async def roles():
+    return ROLE_REQUIREMENTS
+
+
+@app.post("/analyses")
+async def analyze(
+    resume: UploadFile = File(...),
+    role: Optional[str] = Form(None),
+    jd_text: Optional[str] = Form(None, max_length=API_MAX_JD_CHARS),
+    jd_file: Optional[UploadFile] = File(None),
+    cutoff_score: int = Form(75, ge=0, le=100),
+):
+    """Analyze a resume against a built-in role or a job description"""
+    if role is None and not jd_text and jd_file is None:
+        raise HTTPException(422, "One of role, jd_text or jd_file is required")
+    if role is not None and role not in ROLE_REQUIREMENTS:
+        raise HTTPException(422, f"Unknown role: {role}")
+
+    resume_document = await read_upload(resume)
+    custom_jd = None
+    if jd_file is not None:
+        custom_jd = await read_upload(jd_file)
+    elif jd_text:
+        custom_jd = io.BytesIO(jd_text.encode("utf-8"))
+        custom_jd.name = "job_description.txt"
+
+    async with analysis_slot():
+        agent = ResumeAnalysisAgent(api_key=None, cutoff_score=cutoff_score)
+        try:
+            result = await agent.aanalyze_resume(
+                resume_document,
+                role_requirements=None if custom_jd else ROLE_REQUIREMENTS[role],
+                custom_jd=custom_jd,
+            )
+        finally:
+            agent.cleanup()
+    if not result:
+        raise HTTPException(422, "No skills found to analyze against")
+    return result
+
+
+@app.get("/analyses/{analysis_id}")
+async def get_analysis(analysis_id: str):
+    return await load_result(analysis_id)
+
+
+@app.get("/analyses/{analysis_id}/report")
+async def get_report(analysis_id: str, format: Literal[tuple(reports.REPORT_FORMATS)] = "txt"):
+    result = await load_result(analysis_id)
+    _, mime, extension = reports.REPORT_FORMATS[format]
+    return Response(
+        reports.render_report(result, format),
+        media_type=mime,
+        headers={"Content-Disposition": f'attachment; filename="resume_analysis.{extension}"'},
+    )
+
+
+@app.post("/analyses/{analysis_id}/questions")
+async def ask_question(analysis_id: str, request: QuestionRequest):
+    """Answer a question about an analyzed resume"""
+    agent = await load_agent(analysis_id)
+    try:
+        answer = await asyncio.to_thread(agent.ask_question, request.question)
+    finally:
+        agent.cleanup()
+    return {"question": request.question, "answer": answer}
+
+
+@app.post("/analyses/{analysis_id}/interview-questions")
+async def interview_questions(analysis_id: str, request: InterviewRequest):
+    """Personalized interview questions for an analyzed resume"""
+    agent = await load_agent(analysis_id)
+    try:
+        questions = await asyncio.to_thread(
+            agent.generate_interview_questions, request.question_types, request.difficulty, request.num_questions
+        )
+    finally:
+        agent.cleanup()
+    return {"questions": [{"type": question_type, "question": question} for question_type, question in questions]}
+
+
+def main():
+    import argparse
+
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serve resume analysis over HTTP")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=1, help="Server processes")
+    args = parser.parse_args()
+    uvicorn.run("api:app", host=args.host, port=args.port, workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
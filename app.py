@@ -9,57 +9,48 @@ st.set_page_config(
 )
 
 import ui
-from agents import ResumeAnalysisAgent
+import jobs
+import telemetry
+from roles import ROLE_REQUIREMENTS, precompute_role_data
 import atexit
+import logging
+import threading
 from dotenv import load_dotenv
 load_dotenv()
 import os
 google_api_key = os.getenv("GOOGLE_API_KEY")
 
-# Role requirements dictionary
-ROLE_REQUIREMENTS = {
-    "AI/ML Engineer": [
-        "Python", "LLM", "Machine Learning",
-        "Langchain", "Scikit-Learn", "NLP", "RAG",
-        "Hugging Face", "Feature Engineering", "Generative AI"
-    ],
-    "Frontend Engineer": [
-        "React", "Vue", "Angular", "HTML5", "CSS3", "JavaScript", "TypeScript",
-        "Next.js", "Svelte", "Bootstrap", "Tailwind CSS", "GraphQL", "Redux",
-        "WebAssembly", "Three.js", "Performance Optimization"
-    ],
-    "Backend Engineer": [
-        "Python", "Java", "Node.js", "REST APIs", "Cloud services", "Kubernetes",
-        "Docker", "GraphQL", "Microservices", "gRPC", "Spring Boot", "Flask",
-        "FastAPI", "SQL & NoSQL Databases", "Redis", "RabbitMQ", "CI/CD"
-    ],
-    "Data Engineer": [
-        "Python", "SQL", "Apache Spark", "Hadoop", "Kafka", "ETL Pipelines",
-        "Airflow", "BigQuery", "Redshift", "Data Warehousing", "Snowflake",
-        "Azure Data Factory", "GCP", "AWS Glue", "DBT"
-    ],
-    "DevOps Engineer": [
-        "Kubernetes", "Docker", "Terraform", "CI/CD", "AWS", "Azure", "GCP",
-        "Jenkins", "Ansible", "Prometheus", "Grafana", "Helm", "Linux Administration",
-        "Networking", "Site Reliability Engineering (SRE)"
-    ],
-    "Full Stack Developer": [
-        "JavaScript", "TypeScript", "React", "Node.js", "Express", "MongoDB",
-        "SQL", "HTML5", "CSS3", "RESTful APIs", "Git", "CI/CD", "Cloud Services",
-        "Responsive Design", "Authentication & Authorization"
-    ],
-    "Product Manager": [
-        "Product Strategy", "User Research", "Agile Methodologies", "Roadmapping",
-        "Market Analysis", "Stakeholder Management", "Data Analysis", "User Stories",
-        "Product Lifecycle", "A/B Testing", "KPI Definition", "Prioritization",
-        "Competitive Analysis", "Customer Journey Mapping"
-    ],
-    "Data Scientist": [
-        "Python", "R", "SQL", "Machine Learning", "Statistics", "Data Visualization",
-        "Pandas", "NumPy", "Scikit-learn", "Jupyter", "Hypothesis Testing",
-        "Experimental Design", "Feature Engineering", "Model Evaluation"
-    ]
-}
+# Add every analyzed resume to the persistent talent pool
+TALENT_POOL_ENABLED = os.getenv("TALENT_POOL_ENABLED", "").lower() in ("1", "true", "yes")
+
+logger = logging.getLogger(__name__)
+
+@st.cache_resource(show_spinner=False)
+def warm_role_data():
+    """Precompute role skill data once per process without blocking the first page view"""
+    def run():
+        try:
+            precompute_role_data()
+        except Exception:
+            logger.exception("Error precomputing role data")
+
+    threading.Thread(target=run, daemon=True).start()
+
+warm_role_data()
+
+# Metrics endpoint (TELEMETRY_PORT) shared by every session; starts once per process
+telemetry.start_metrics_server()
+
+@st.cache_resource(show_spinner=False)
+def load_agent_class():
+    """Import the LangChain/FAISS analysis stack once per process, on first use"""
+    from agents import ResumeAnalysisAgent
+    return ResumeAnalysisAgent
+
+@st.cache_resource(show_spinner=False)
+def job_queue():
+    """Start the background analysis workers once per process"""
+    return jobs.start_workers()
 
 # Initialize session state variables
 if 'resume_agent' not in st.session_state:
@@ -71,6 +62,13 @@ if 'resume_analyzed' not in st.session_state:
 if 'analysis_result' not in st.session_state:
     st.session_state.analysis_result = None
 
+if 'job_id' not in st.session_state:
+    # The job ID is kept in the URL so a reloaded page picks the running analysis up again
+    st.session_state.job_id = st.query_params.get("job")
+
+if 'loaded_job_id' not in st.session_state:
+    st.session_state.loaded_job_id = None
+
 
 # Important part to check
 def setup_agent(config):
@@ -81,32 +79,69 @@ def setup_agent(config):
 
     # Initialize or update the agent with the API key
     if st.session_state.resume_agent is None:
-        st.session_state.resume_agent = ResumeAnalysisAgent(api_key=config["google_api_key"])
+        st.session_state.resume_agent = load_agent_class()(api_key=config["google_api_key"])
     else:
         st.session_state.resume_agent.api_key = config["google_api_key"]
 
     return st.session_state.resume_agent
 
 def analyze_resume(agent, resume_file, role, custom_jd):
-    """Analyze the resume with the agent"""
+    """Submit the resume for analysis as a background job"""
     if not resume_file:
         st.error("⚠️ Please upload a resume.")
         return None
 
     try:
-        with st.spinner("🔍 Analyzing resume... This may take a minute."):
-            if custom_jd:
-                result = agent.analyze_resume(resume_file, custom_jd=custom_jd)
-            else:
-                result = agent.analyze_resume(resume_file, role_requirements=ROLE_REQUIREMENTS[role])
-
-            st.session_state.resume_analyzed = True
-            st.session_state.analysis_result = result
-            return result
+        job_id = job_queue().submit(
+            resume_file.name,
+            resume_file.getvalue(),
+            role_requirements=None if custom_jd else ROLE_REQUIREMENTS[role],
+            jd_name=custom_jd.name if custom_jd else None,
+            jd=custom_jd.getvalue() if custom_jd else None,
+            cutoff_score=agent.cutoff_score,
+            add_to_talent_pool=TALENT_POOL_ENABLED,
+        )
     except Exception as e:
         st.error(f"⚠️ Error analyzing resume: {e}")
         return None
 
+    st.session_state.job_id = job_id
+    st.session_state.loaded_job_id = None
+    st.session_state.resume_analyzed = False
+    st.session_state.analysis_result = None
+    st.query_params["job"] = job_id
+    return job_id
+
+def load_job_result(agent):
+    """Load the result of the session's finished job into the agent; returns the job, or None"""
+    job_id = st.session_state.job_id
+    if not job_id:
+        return None
+    job = job_queue().get(job_id)
+    if job is None:
+        st.session_state.job_id = None
+        st.query_params.pop("job", None)
+        return None
+    if job["status"] == "done" and agent and st.session_state.loaded_job_id != job_id:
+        # Restores the Q&A and interview state from the result cache, without analyzing again
+        restored = agent.load_analysis(job["result"]["analysis_id"])
+        st.session_state.analysis_result = job["result"]
+        st.session_state.resume_analyzed = restored is not None
+        st.session_state.loaded_job_id = job_id
+        if restored is None:
+            # Without the cached analysis the job cannot be resumed; analyzing again submits a new one
+            job_queue().delete(job_id)
+            st.warning("⚠️ This analysis has expired. Analyze the resume again to ask questions about it.")
+    return job
+
+@st.fragment(run_every=1)
+def job_progress(job_id):
+    """Poll the background job, rerunning the page once it finishes"""
+    job = job_queue().get(job_id)
+    if job is None or job["status"] in jobs.FINISHED_STATUSES:
+        st.rerun(scope="app")
+    ui.display_job_progress(job)
+
 def ask_question(agent, question):
     """Ask a question about the resume"""
     try:
@@ -116,6 +151,13 @@ def ask_question(agent, question):
     except Exception as e:
         return f"Error: {e}"
 
+def stream_answer(agent, question):
+    """Stream the answer to a question about the resume"""
+    try:
+        yield from agent.stream_answer(question)
+    except Exception as e:
+        yield f"Error: {e}"
+
 def generate_interview_questions(agent, question_types, difficulty, num_questions):
     """Generate interview questions based on the resume"""
     try:
@@ -126,6 +168,13 @@ def generate_interview_questions(agent, question_types, difficulty, num_question
         st.error(f"⚠️ Error generating questions: {e}")
         return []
 
+def stream_interview_questions(agent, question_types, difficulty, num_questions):
+    """Stream interview questions based on the resume"""
+    try:
+        yield from agent.stream_interview_questions(question_types, difficulty, num_questions)
+    except Exception as e:
+        st.error(f"⚠️ Error generating questions: {e}")
+
 def improve_resume(agent, improvement_areas, target_role):
     """Generate resume improvement suggestions"""
     try:
@@ -162,13 +211,14 @@ def main():
 
     # Set up the agent
     agent = setup_agent(config)
+    job = load_job_result(agent)
 
     # Create tabs for different functionalities
     tabs = ui.create_tabs()
 
     # Tab 1: Resume Analysis
     with tabs[0]:
-        role, custom_jd = ui.role_selection_section(ROLE_REQUIREMENTS)
+        role, custom_jd = ui.role_selection_section(ROLE_REQUIREMENTS, agent.cutoff_score if agent else 75)
         uploaded_resume = ui.resume_upload_section()
 
         col1, col2, col3 = st.columns([1, 1, 1])
@@ -176,8 +226,14 @@ def main():
             if st.button("🔍 Analyze Resume", type="primary"):
                 if agent and uploaded_resume:
                     # Just store the result, don't display it here
-                    analyze_resume(agent, uploaded_resume, role, custom_jd)
-                    
+                    if analyze_resume(agent, uploaded_resume, role, custom_jd):
+                        job = job_queue().get(st.session_state.job_id)
+
+        if job and job["status"] not in jobs.FINISHED_STATUSES:
+            job_progress(job["id"])
+        elif job and job["status"] == "failed":
+            st.error(f"⚠️ Error analyzing resume: {job['error']}")
+
         # Display analysis result (only once)
         if st.session_state.analysis_result:
             ui.display_analysis_results(st.session_state.analysis_result)
@@ -188,7 +244,8 @@ def main():
         if st.session_state.resume_analyzed and st.session_state.resume_agent:
             ui.resume_qa_section(
                 has_resume=True,  # Explicitly set to True since we checked above
-                ask_question_func=lambda q: ask_question(st.session_state.resume_agent, q)
+                ask_question_func=lambda q: ask_question(st.session_state.resume_agent, q),
+                stream_answer_func=lambda q: stream_answer(st.session_state.resume_agent, q)
             )
         else:
             st.warning("Please upload and analyze a resume first in the 'Resume Analysis' tab.")
@@ -199,7 +256,8 @@ def main():
         if st.session_state.resume_analyzed and st.session_state.resume_agent:
             ui.interview_questions_section(
                 has_resume=True,  # Explicitly set to True since we checked above
-                generate_questions_func=lambda types, diff, num: generate_interview_questions(st.session_state.resume_agent, types, diff, num)
+                generate_questions_func=lambda types, diff, num: generate_interview_questions(st.session_state.resume_agent, types, diff, num),
+                stream_questions_func=lambda types, diff, num: stream_interview_questions(st.session_state.resume_agent, types, diff, num)
             )
         else:
             st.warning("Please upload and analyze a resume first in the 'Resume Analysis' tab.")
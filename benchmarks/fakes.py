@@ -0,0 +1,231 @@
+import asyncio
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from roles import ALL_ROLE_SKILLS
+
+
+class FakeRateLimitError(Exception):
+    """Quota error shaped like an HTTP 429 from the API"""
+
+    status_code = 429
+
+
+def stable_int(*parts):
+    """Deterministic integer derived from strings, identical across runs and processes"""
+    return int.from_bytes(hashlib.sha256("\0".join(parts).encode("utf-8")).digest()[:8], "big")
+
+
+class CallStats:
+    """Thread-safe counters shared by the fake models"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.llm_calls = 0
+            self.prompt_chars = []
+            self.response_chars = 0
+            self.embed_calls = 0
+            self.embedded_texts = 0
+            self.throttled = 0
+            # Fixed seed so runs with the same error rate fail the same calls
+            self._errors = random.Random(0)
+
+    def maybe_throttle(self, error_rate):
+        """Raise FakeRateLimitError for the given fraction of calls"""
+        if not error_rate:
+            return
+        with self._lock:
+            throttled = self._errors.random() < error_rate
+            if throttled:
+                self.throttled += 1
+        if throttled:
+            raise FakeRateLimitError("429 Resource has been exhausted (fake)")
+
+    def record_llm(self, prompt, response):
+        with self._lock:
+            self.llm_calls += 1
+            self.prompt_chars.append(len(prompt))
+            self.response_chars += len(response)
+
+    def record_embed(self, texts):
+        with self._lock:
+            self.embed_calls += 1
+            self.embedded_texts += len(texts)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "llm_calls": self.llm_calls,
+                "prompt_chars": list(self.prompt_chars),
+                "response_chars": self.response_chars,
+                "embed_calls": self.embed_calls,
+                "embedded_texts": self.embedded_texts,
+                "throttled": self.throttled,
+            }
+
+
+STATS = CallStats()
+
+
+def _section(prompt, start, end):
+    if start not in prompt:
+        return ""
+    text = prompt.split(start, 1)[1]
+    return text.split(end, 1)[0] if end in text else text
+
+
+def _skill_score(skill, context):
+    # Skills named in the context score high, everything else gets a stable low score
+    if skill.lower() in context.lower():
+        return 6 + stable_int(skill, "present") % 5
+    return stable_int(skill, "absent") % 5
+
+
+def fake_response(prompt):
+    """Deterministic response shaped like Gemini's output for each prompt the agent sends"""
+    if "Return a JSON array with exactly one object per skill" in prompt:
+        skills = re.findall(r"^\s*- (.+)$", _section(prompt, "Skills:", "Resume Content:"), re.M)
+        context = _section(prompt, "Resume Content:", "Return a JSON array")
+        return json.dumps([
+            {"skill": skill, "score": _skill_score(skill, context), "reasoning": f"Evidence for {skill} reviewed."}
+            for skill in skills
+        ])
+
+    single = re.search(r"mention proficiency in (.+?)\? Provide a numeric rating", prompt)
+    if single:
+        skill = single.group(1)
+        return f"{_skill_score(skill, prompt.split('Question:')[0])}. The resume context was reviewed for {skill}."
+
+    if "Analyze why the resume is weak" in prompt:
+        skill = re.search(r'proficiency in "(.+?)"', prompt).group(1)
+        return json.dumps({
+            "weakness": f"The resume does not show hands-on work with {skill}.",
+            "improvement_suggestions": [f"Add a project using {skill}", f"Quantify results achieved with {skill}",
+                                        f"List {skill} in the skills section"],
+            "example_addition": f"Built a production service with {skill}, cutting latency by 30%.",
+        })
+
+    if "Extract a comprehensive list" in prompt:
+        jd_text = prompt.split("Job Description:", 1)[-1].lower()
+        return json.dumps([skill for skill in ALL_ROLE_SKILLS if skill.lower() in jd_text])
+
+    if "interview questions" in prompt:
+        count = int(re.search(r"Generate (\d+)", prompt).group(1))
+        types = [t.strip() for t in re.search(r"question types: (.+?)\.\s", prompt).group(1).split(",")]
+        return "\n".join(
+            f'("{types[i % len(types)]}", "Question {i + 1}: describe your experience relevant to this role.")'
+            for i in range(count)
+        )
+
+    question = prompt.rsplit("Question:", 1)[-1].split("Helpful Answer:")[0].strip()
+    words = ["The", "resume", "indicates"] + [f"detail{stable_int(question, str(i)) % 1000}" for i in range(40)]
+    return " ".join(words) + "."
+
+
+class FakeChatModel(BaseChatModel):
+    """Chat model that sleeps for a fixed latency and returns fake_response(prompt), or fails with a 429"""
+
+    latency: float = 0.2
+    chunk_latency: float = 0.005
+    chunk_chars: int = 16
+    error_rate: float = 0.0
+
+    @property
+    def _llm_type(self):
+        return "fake-benchmark"
+
+    def _respond(self, messages):
+        STATS.maybe_throttle(self.error_rate)
+        # Chains may split the prompt into system and human messages
+        prompt = "\n\n".join(message.content for message in messages)
+        response = fake_response(prompt)
+        STATS.record_llm(prompt, response)
+        return response
+
+    def _chunks(self, text):
+        return [text[i:i + self.chunk_chars] for i in range(0, len(text), self.chunk_chars)]
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        response = self._respond(messages)
+        time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=response))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        response = self._respond(messages)
+        await asyncio.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=response))])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        response = self._respond(messages)
+        time.sleep(self.latency)
+        for chunk in self._chunks(response):
+            time.sleep(self.chunk_latency)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=chunk))
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        response = self._respond(messages)
+        await asyncio.sleep(self.latency)
+        for chunk in self._chunks(response):
+            await asyncio.sleep(self.chunk_latency)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=chunk))
+
+
+class FakeEmbeddings(Embeddings):
+    """Deterministic unit vectors from text hashes, with a fixed latency per call"""
+
+    def __init__(self, dimension=64, latency=0.05, error_rate=0.0):
+        self.dimension = dimension
+        self.latency = latency
+        self.error_rate = error_rate
+
+    def _vector(self, text):
+        rng = np.random.default_rng(stable_int(text))
+        vector = rng.standard_normal(self.dimension)
+        return (vector / np.linalg.norm(vector)).tolist()
+
+    def embed_documents(self, texts):
+        STATS.maybe_throttle(self.error_rate)
+        STATS.record_embed(texts)
+        time.sleep(self.latency)
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+    async def aembed_documents(self, texts):
+        STATS.maybe_throttle(self.error_rate)
+        STATS.record_embed(texts)
+        await asyncio.sleep(self.latency)
+        return [self._vector(text) for text in texts]
+
+    async def aembed_query(self, text):
+        return (await self.aembed_documents([text]))[0]
+
+
+def install(llm_latency=0.2, embed_latency=0.05, chunk_latency=0.005, dimension=64, error_rate=0.0):
+    """Route every LLM and embedding client created by llm_clients to the fakes"""
+    import llm_clients
+
+    # Only the API clients are replaced, so calls still go through the embedding cache and the
+    # scheduler; error_rate is the fraction of calls that fail with a 429 the scheduler must retry
+
+    llm_clients._create_llm = lambda temperature: FakeChatModel(
+        latency=llm_latency, chunk_latency=chunk_latency, error_rate=error_rate
+    )
+    llm_clients._create_embeddings = lambda: FakeEmbeddings(dimension, embed_latency, error_rate)
+    llm_clients.get_llm.cache_clear()
+    llm_clients.get_embeddings.cache_clear()
@@ -0,0 +1,315 @@
+import argparse
+import asyncio
+import functools
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Agent methods timed as pipeline stages; stages run inside analyze_resume and may overlap
+STAGES = {
+    "extract_text": "extract_text_from_file",
+    "index_build": "_aload_resume_text",
+    "jd_skills": "_aprepare_skills",
+    "skill_scoring": "asemantic_skill_analysis",
+    "weaknesses": "aanalyze_resume_weaknesses",
+}
+
+QUESTIONS = [
+    "What is the candidate's most recent role?",
+    "How many years of Python experience does the candidate have?",
+    "What projects has the candidate worked on?",
+]
+
+# Metrics compared against a baseline run; higher is worse for all of them
+COMPARED_METRICS = ["mean_s", "llm_calls", "embed_calls", "prompt_chars_total", "peak_memory_kb"]
+
+FILLER = [
+    "Collaborated with product and design to ship features on a two week cadence.",
+    "Mentored junior engineers and led code reviews for the team.",
+    "Improved on-call runbooks and reduced incident response time.",
+    "Wrote technical documentation and onboarding guides.",
+]
+
+
+def make_resume(rng, name, role_skills):
+    """Synthetic resume that mentions a random subset of a role's skills"""
+    known = rng.sample(role_skills, k=max(1, int(len(role_skills) * rng.uniform(0.3, 0.8))))
+    lines = [name, "", "Summary", f"Engineer with {rng.randint(2, 12)} years of experience.", "", "Experience"]
+    for job in range(3):
+        lines.append(f"Company {job + 1} - Senior Engineer ({2015 + job * 3}-{2018 + job * 3})")
+        for skill in rng.sample(known, k=min(3, len(known))):
+            lines.append(f"- Delivered a production system using {skill} serving {rng.randint(1, 50)}k users.")
+        lines += [f"- {rng.choice(FILLER)}" for _ in range(4)]
+    lines += ["", "Projects"]
+    lines += [f"- Open source tool built with {skill}." for skill in rng.sample(known, k=min(2, len(known)))]
+    lines += ["", "Skills", ", ".join(known), "", "Education", "BSc Computer Science"]
+    return "\n".join(lines)
+
+
+def make_jd(rng, role, role_skills):
+    """Synthetic job description for a role"""
+    required = rng.sample(role_skills, k=max(1, len(role_skills) * 2 // 3))
+    return "\n".join([
+        f"We are hiring a {role}.",
+        "Responsibilities include designing, building and operating services.",
+        "Requirements:",
+        *[f"- Experience with {skill}" for skill in required],
+    ])
+
+
+def make_corpus(directory, count, seed):
+    """Write synthetic resumes and JDs; returns (resume_path, role_skills, jd_path) tuples"""
+    from roles import ROLE_REQUIREMENTS
+
+    rng = random.Random(seed)
+    roles = sorted(ROLE_REQUIREMENTS)
+    corpus = []
+    for i in range(count):
+        role = roles[i % len(roles)]
+        resume_path = os.path.join(directory, f"resume_{i:03d}.txt")
+        with open(resume_path, "w", encoding="utf-8") as f:
+            f.write(make_resume(rng, f"Candidate {i}", ROLE_REQUIREMENTS[role]))
+
+        # Every other candidate is screened against a custom JD instead of a built-in role
+        jd_path = None
+        if i % 2:
+            jd_path = os.path.join(directory, f"jd_{i:03d}.txt")
+            with open(jd_path, "w", encoding="utf-8") as f:
+                f.write(make_jd(rng, role, ROLE_REQUIREMENTS[role]))
+        corpus.append((resume_path, ROLE_REQUIREMENTS[role], jd_path))
+    return corpus
+
+
+def instrument(agent_class, timings):
+    """Wrap the stage methods of the agent class so their wall time is recorded"""
+    for stage, name in STAGES.items():
+        original = getattr(agent_class, name)
+        if asyncio.iscoroutinefunction(original):
+            async def wrapper(*args, _original=original, _stage=stage, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return await _original(*args, **kwargs)
+                finally:
+                    timings.setdefault(_stage, []).append(time.perf_counter() - started)
+        else:
+            def wrapper(*args, _original=original, _stage=stage, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return _original(*args, **kwargs)
+                finally:
+                    timings.setdefault(_stage, []).append(time.perf_counter() - started)
+        setattr(agent_class, name, functools.wraps(original)(wrapper))
+
+
+class Recorder:
+    """Collects wall time, call counts, prompt sizes and peak memory per operation"""
+
+    def __init__(self, stats, track_memory):
+        self.stats = stats
+        self.track_memory = track_memory
+        self.operations = {}
+
+    def run(self, operation, func, *args, **kwargs):
+        before = self.stats.snapshot()
+        if self.track_memory:
+            tracemalloc.reset_peak()
+            baseline_memory = tracemalloc.get_traced_memory()[0]
+        started = time.perf_counter()
+        result = func(*args, **kwargs)
+        elapsed = time.perf_counter() - started
+        after = self.stats.snapshot()
+
+        record = self.operations.setdefault(operation, {
+            "times": [], "llm_calls": 0, "embed_calls": 0, "embedded_texts": 0, "prompt_chars": [], "peak_memory": 0,
+            "throttled": 0,
+        })
+        record["times"].append(elapsed)
+        record["llm_calls"] += after["llm_calls"] - before["llm_calls"]
+        record["embed_calls"] += after["embed_calls"] - before["embed_calls"]
+        record["embedded_texts"] += after["embedded_texts"] - before["embedded_texts"]
+        record["throttled"] += after["throttled"] - before["throttled"]
+        record["prompt_chars"] += after["prompt_chars"][len(before["prompt_chars"]):]
+        if self.track_memory:
+            # Memory allocated on top of what was already live when the operation started
+            record["peak_memory"] = max(record["peak_memory"], tracemalloc.get_traced_memory()[1] - baseline_memory)
+        return result
+
+    def summary(self):
+        return {operation: summarize_operation(record) for operation, record in self.operations.items()}
+
+
+def summarize_times(times):
+    ordered = sorted(times)
+    return {
+        "count": len(times),
+        "total_s": round(sum(times), 4),
+        "mean_s": round(statistics.mean(times), 4),
+        "p50_s": round(ordered[len(ordered) // 2], 4),
+        "p95_s": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 4),
+    }
+
+
+def summarize_operation(record):
+    prompts = record["prompt_chars"]
+    return {
+        **summarize_times(record["times"]),
+        "llm_calls": record["llm_calls"],
+        "embed_calls": record["embed_calls"],
+        "embedded_texts": record["embedded_texts"],
+        "throttled": record["throttled"],
+        "prompt_chars_total": sum(prompts),
+        "prompt_chars_mean": round(statistics.mean(prompts)) if prompts else 0,
+        "prompt_chars_max": max(prompts, default=0),
+        "peak_memory_kb": round(record["peak_memory"] / 1024),
+    }
+
+
+def run_pass(agent_class, corpus, recorder, questions, interview_questions):
+    for resume_path, role_skills, jd_path in corpus:
+        agent = agent_class(api_key=None)
+        try:
+            if jd_path:
+                recorder.run("analyze_resume", agent.analyze_resume, resume_path, custom_jd=jd_path)
+            else:
+                recorder.run("analyze_resume", agent.analyze_resume, resume_path, role_requirements=role_skills)
+            for question in questions:
+                recorder.run("ask_question", agent.ask_question, question)
+            if interview_questions:
+                recorder.run(
+                    "generate_interview_questions", agent.generate_interview_questions,
+                    ["Technical", "Experience"], "Medium", interview_questions,
+                )
+        finally:
+            agent.cleanup()
+
+
+def git_commit():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                               capture_output=True, text=True, check=True).stdout.strip()
+        return f"{commit}-dirty" if dirty else commit
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline, results, max_regression):
+    """Print metric changes against a baseline run; returns the regressions beyond the threshold"""
+    regressions = []
+    print(f"\nCompared with {baseline.get('commit')}:")
+    for pass_name, operations in results["passes"].items():
+        for operation, summary in operations.items():
+            old = baseline.get("passes", {}).get(pass_name, {}).get(operation)
+            if not old:
+                continue
+            for metric in COMPARED_METRICS:
+                if metric not in old or metric not in summary:
+                    continue
+                before, after = old[metric], summary[metric]
+                change = (after - before) / before if before else (1.0 if after else 0.0)
+                flag = ""
+                if change > max_regression:
+                    flag = "  REGRESSION"
+                    regressions.append(f"{pass_name}.{operation}.{metric}")
+                print(f"  {pass_name:<5} {operation:<30} {metric:<20} {before:>12} -> {after:>12} "
+                      f"({change:+.1%}){flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the analysis pipeline with local fake models")
+    parser.add_argument("--resumes", type=int, default=12, help="Synthetic resumes in the corpus")
+    parser.add_argument("--seed", type=int, default=7, help="Corpus seed; keep fixed to compare runs")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="Seconds per fake LLM call")
+    parser.add_argument("--embed-latency", type=float, default=0.05, help="Seconds per fake embedding call")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="Fraction of fake API calls that fail with a 429 and are retried")
+    parser.add_argument("--questions", type=int, default=len(QUESTIONS), help="Q&A questions per resume")
+    parser.add_argument("--interview-questions", type=int, default=5, help="Interview questions per resume (0 skips)")
+    parser.add_argument("--no-warm", action="store_true", help="Skip the second pass over warm caches")
+    parser.add_argument("--no-memory", action="store_true", help="Skip tracemalloc peak memory tracking")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument("--compare", help="Baseline JSON from an earlier run to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.10,
+                        help="Relative increase in a compared metric that fails the run")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        # Caches start empty so the cold pass measures real work
+        os.environ["RESUME_AGENT_CACHE_DIR"] = os.path.join(workdir, "cache")
+        import fakes
+        from agents import ResumeAnalysisAgent
+
+        fakes.install(llm_latency=args.llm_latency, embed_latency=args.embed_latency, error_rate=args.error_rate)
+        corpus = make_corpus(workdir, args.resumes, args.seed)
+        questions = QUESTIONS[:args.questions]
+
+        stage_timings = {"cold": {}, "warm": {}}
+        passes = {}
+        if not args.no_memory:
+            tracemalloc.start()
+        for pass_name in ("cold",) if args.no_warm else ("cold", "warm"):
+            timings = stage_timings[pass_name]
+            instrument(ResumeAnalysisAgent, timings)
+            recorder = Recorder(fakes.STATS, track_memory=not args.no_memory)
+            run_pass(ResumeAnalysisAgent, corpus, recorder, questions, args.interview_questions)
+            passes[pass_name] = {
+                **recorder.summary(),
+                **{f"stage.{stage}": summarize_times(times) for stage, times in timings.items()},
+            }
+            # Undo the wrappers so the next pass is not timed twice
+            for name in STAGES.values():
+                setattr(ResumeAnalysisAgent, name, getattr(ResumeAnalysisAgent, name).__wrapped__)
+        if not args.no_memory:
+            tracemalloc.stop()
+
+    results = {
+        "commit": git_commit(),
+        "python": sys.version.split()[0],
+        "config": {
+            "resumes": args.resumes, "seed": args.seed, "llm_latency": args.llm_latency,
+            "embed_latency": args.embed_latency, "error_rate": args.error_rate, "questions": len(questions),
+            "interview_questions": args.interview_questions, "memory_tracking": not args.no_memory,
+        },
+        "passes": passes,
+    }
+
+    for pass_name, operations in passes.items():
+        print(f"{pass_name} caches")
+        for operation, summary in operations.items():
+            line = f"  {operation:<30} n={summary['count']:<4} mean {summary['mean_s'] * 1000:8.1f} ms  " \
+                   f"p95 {summary['p95_s'] * 1000:8.1f} ms"
+            if "llm_calls" in summary:
+                line += f"  llm {summary['llm_calls']:<4} embed {summary['embed_calls']:<4} " \
+                        f"prompt chars {summary['prompt_chars_total']:<8} peak {summary['peak_memory_kb']} KB"
+                if summary["throttled"]:
+                    line += f"  throttled {summary['throttled']}"
+            print(line)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("config") != results["config"]:
+            print("Warning: baseline was recorded with a different configuration")
+        regressions = compare(baseline, results, args.max_regression)
+        if regressions:
+            print(f"{len(regressions)} metrics regressed by more than {args.max_regression:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules on the path of a cold page view, from lightest to the full app script
+MODULES = ["ui", "llm_clients", "agents"]
+
+FIRST_RENDER_SCRIPT = """
+import time
+started = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+AppTest.from_file("app.py", default_timeout=120).run()
+print(time.perf_counter() - started)
+"""
+
+
+def _run_python(code):
+    # Each measurement gets a fresh interpreter so nothing is already imported
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def time_import(module):
+    """Seconds to import a module in a fresh interpreter"""
+    return _run_python(
+        f"import time; started = time.perf_counter(); import {module}; print(time.perf_counter() - started)"
+    )
+
+
+def time_first_render():
+    """Seconds for a fresh interpreter to run the app script once, as for a first page view"""
+    return _run_python(FIRST_RENDER_SCRIPT)
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_server_ready(timeout=120):
+    """Seconds from launching `streamlit run app.py` until its health check passes"""
+    port = _free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", "app.py", "--server.port", str(port),
+         "--server.headless", "true"],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.05)
+        raise TimeoutError(f"Streamlit server did not become healthy within {timeout}s")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def summarize(samples):
+    return {
+        "median": round(statistics.median(samples), 4),
+        "min": round(min(samples), 4),
+        "max": round(max(samples), 4),
+        "runs": len(samples),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold-start latency of the Streamlit app")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per measurement")
+    parser.add_argument("--server", action="store_true", help="Also time a full `streamlit run` until healthy")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    results = {"python": sys.version.split()[0], "imports": {}}
+    for module in MODULES:
+        results["imports"][module] = summarize([time_import(module) for _ in range(args.runs)])
+    results["first_render"] = summarize([time_first_render() for _ in range(args.runs)])
+    if args.server:
+        results["server_ready"] = summarize([time_server_ready() for _ in range(args.runs)])
+
+    for name, summary in [*results["imports"].items(), *(
+        (key, results[key]) for key in ("first_render", "server_ready") if key in results
+    )]:
+        print(f"{name:<14} median {summary['median'] * 1000:8.1f} ms  "
+              f"(min {summary['min'] * 1000:.1f}, max {summary['max'] * 1000:.1f})")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
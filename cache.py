@@ -0,0 +1,167 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+CACHE_DIR = os.getenv("RESUME_AGENT_CACHE_DIR", ".cache")
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "50000"))
+JD_SKILLS_CACHE_MAX_ENTRIES = int(os.getenv("JD_SKILLS_CACHE_MAX_ENTRIES", "5000"))
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "20000"))
+RESULT_CACHE_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "2000"))
+RESULT_CACHE_MAX_BYTES = int(os.getenv("RESULT_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+RESULT_CACHE_TTL = float(os.getenv("RESULT_CACHE_TTL", str(7 * 24 * 3600)))
+
+
+def content_hash(*parts):
+    """Stable SHA-256 hex digest of one or more strings"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class DiskLRUCache:
+    """SQLite-backed key/value store with least-recently-used eviction.
+
+    Safe to share between threads and processes: every thread gets its own
+    connection and SQLite's WAL mode serializes writers. With a ttl (seconds),
+    entries older than that are treated as missing and purged on the next write.
+    With max_bytes, least recently used entries are also evicted once the stored
+    values exceed that total size.
+    """
+
+    def __init__(self, path, max_entries=10000, ttl=None, max_bytes=None):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at)")
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(entries)")]
+            if "created_at" not in columns:
+                # Caches created before entries had an age
+                conn.execute("ALTER TABLE entries ADD COLUMN created_at REAL NOT NULL DEFAULT 0")
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get_many(self, keys):
+        """Return a dict of the cached values for the keys that are present"""
+        if not keys:
+            return {}
+        conn = self._connect()
+        found = {}
+        oldest = time.time() - self.ttl if self.ttl else 0
+        # Stay well below SQLite's host parameter limit
+        for start in range(0, len(keys), 500):
+            batch = keys[start:start + 500]
+            placeholders = ",".join("?" * len(batch))
+            rows = conn.execute(
+                f"SELECT key, value FROM entries WHERE key IN ({placeholders}) AND created_at >= ?",
+                [*batch, oldest],
+            ).fetchall()
+            found.update(rows)
+            if rows:
+                conn.executemany(
+                    "UPDATE entries SET accessed_at = ? WHERE key = ?",
+                    [(time.time(), key) for key, _ in rows],
+                )
+        return found
+
+    def get(self, key):
+        return self.get_many([key]).get(key)
+
+    def set_many(self, items):
+        """Store (key, value) pairs and evict the least recently used overflow"""
+        if not items:
+            return
+        now = time.time()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "INSERT OR REPLACE INTO entries (key, value, accessed_at, created_at) VALUES (?, ?, ?, ?)",
+                [(key, value, now, now) for key, value in items],
+            )
+            if self.ttl:
+                conn.execute("DELETE FROM entries WHERE created_at < ?", (now - self.ttl,))
+            overflow = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                conn.execute(
+                    "DELETE FROM entries WHERE key IN "
+                    "(SELECT key FROM entries ORDER BY accessed_at LIMIT ?)",
+                    (overflow,),
+                )
+            if self.max_bytes:
+                # Keep the most recently used entries whose running total of value sizes fits
+                conn.execute(
+                    "DELETE FROM entries WHERE key IN (SELECT key FROM (SELECT key, SUM(length(value)) OVER "
+                    "(ORDER BY accessed_at DESC, key) AS total FROM entries) WHERE total > ?)",
+                    (self.max_bytes,),
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def set(self, key, value):
+        self.set_many([(key, value)])
+
+
+def normalize_jd_text(jd_text):
+    """Normalize case and whitespace so trivially different copies of a JD share a key"""
+    return " ".join(jd_text.lower().split())
+
+
+def normalize_question(question):
+    """Normalize case, whitespace and trailing punctuation of a Q&A question"""
+    return " ".join(question.lower().split()).rstrip("?.! ")
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def _get_cache(name, max_entries, ttl=None, max_bytes=None):
+    with _caches_lock:
+        if name not in _caches:
+            _caches[name] = DiskLRUCache(
+                os.path.join(CACHE_DIR, f"{name}.sqlite3"), max_entries=max_entries, ttl=ttl, max_bytes=max_bytes
+            )
+        return _caches[name]
+
+
+def get_embedding_cache():
+    """Process-wide embedding cache shared by all sessions"""
+    return _get_cache("embeddings", EMBEDDING_CACHE_MAX_ENTRIES)
+
+
+def get_jd_skills_cache():
+    """Process-wide cache of skill lists extracted from job descriptions"""
+    return _get_cache("jd_skills", JD_SKILLS_CACHE_MAX_ENTRIES)
+
+
+def get_answer_cache():
+    """Process-wide cache of Q&A answers keyed by resume and question"""
+    return _get_cache("answers", ANSWER_CACHE_MAX_ENTRIES)
+
+
+def get_result_cache():
+    """Process-wide cache of complete resume analysis results"""
+    return _get_cache("results", RESULT_CACHE_MAX_ENTRIES, ttl=RESULT_CACHE_TTL, max_bytes=RESULT_CACHE_MAX_BYTES)
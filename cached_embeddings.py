@@ -0,0 +1,66 @@
+import asyncio
+from array import array
+
+from langchain_core.embeddings import Embeddings
+
+import telemetry
+from cache import content_hash
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that only sends unseen text to the underlying model"""
+
+    def __init__(self, underlying, model_name, cache):
+        self.underlying = underlying
+        self.model_name = model_name
+        self.cache = cache
+
+    def _lookup(self, kind, texts):
+        keys = [content_hash(self.model_name, kind, text) for text in texts]
+        cached = self.cache.get_many(list(dict.fromkeys(keys)))
+
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in missing:
+                missing[key] = text
+        telemetry.record_cache("embeddings", hits=len(texts) - len(missing), misses=len(missing))
+        return keys, cached, missing
+
+    def _store(self, keys, cached, missing, vectors):
+        new_items = [
+            (key, array("f", vector).tobytes()) for key, vector in zip(missing.keys(), vectors)
+        ]
+        self.cache.set_many(new_items)
+        cached.update(new_items)
+
+        results = []
+        for key in keys:
+            vector = array("f")
+            vector.frombytes(cached[key])
+            results.append(vector.tolist())
+        return results
+
+    @telemetry.traced("embedding")
+    def embed_documents(self, texts):
+        keys, cached, missing = self._lookup("document", texts)
+        vectors = self.underlying.embed_documents(list(missing.values())) if missing else []
+        return self._store(keys, cached, missing, vectors)
+
+    @telemetry.traced("embedding.query")
+    def embed_query(self, text):
+        # Queries are embedded with a different task type, so they get their own keys
+        keys, cached, missing = self._lookup("query", [text])
+        vectors = [self.underlying.embed_query(text)] if missing else []
+        return self._store(keys, cached, missing, vectors)[0]
+
+    @telemetry.traced("embedding")
+    async def aembed_documents(self, texts):
+        keys, cached, missing = await asyncio.to_thread(self._lookup, "document", texts)
+        vectors = await self.underlying.aembed_documents(list(missing.values())) if missing else []
+        return await asyncio.to_thread(self._store, keys, cached, missing, vectors)
+
+    @telemetry.traced("embedding.query")
+    async def aembed_query(self, text):
+        keys, cached, missing = await asyncio.to_thread(self._lookup, "query", [text])
+        vectors = [await self.underlying.aembed_query(text)] if missing else []
+        return (await asyncio.to_thread(self._store, keys, cached, missing, vectors))[0]
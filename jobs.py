@@ -0,0 +1,285 @@
+import hashlib
+import io
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+from cache import CACHE_DIR, content_hash
+
+logger = logging.getLogger(__name__)
+
+JOB_DB_PATH = os.getenv("JOB_DB_PATH", os.path.join(CACHE_DIR, "jobs.sqlite3"))
+
+# Analyses run at once per process, and how often idle workers look for new jobs
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_POLL_INTERVAL = 0.5
+
+# A running job without a progress update for this long is assumed lost with its process and requeued,
+# up to JOB_MAX_ATTEMPTS runs in total
+JOB_STALE_AFTER = float(os.getenv("JOB_STALE_AFTER", "600"))
+JOB_MAX_ATTEMPTS = 3
+
+# Finished and failed jobs are deleted after this many seconds
+JOB_RETENTION = float(os.getenv("JOB_RETENTION", str(7 * 24 * 3600)))
+
+# Progress stages in pipeline order
+JOB_STAGES = ("queued", "extracting", "embedding", "scoring", "weaknesses", "done")
+
+FINISHED_STATUSES = ("done", "failed")
+
+
+class JobQueue:
+    """Persistent analysis job queue in SQLite, shared by every thread and process using the same file"""
+
+    def __init__(self, path=JOB_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, status TEXT NOT NULL, stage TEXT NOT NULL, done INTEGER, total INTEGER, "
+                "request TEXT NOT NULL, resume BLOB, jd BLOB, result TEXT, error TEXT, worker TEXT, claim_token TEXT, "
+                "attempts INTEGER NOT NULL DEFAULT 0, "
+                "created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status_created_at ON jobs (status, created_at)")
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def submit(self, resume_name, resume, role_requirements=None, jd_name=None, jd=None, cutoff_score=75,
+               add_to_talent_pool=False):
+        """Queue an analysis and return its job ID; resubmitting the same inputs returns the same job"""
+        request = {
+            "resume_name": resume_name,
+            "role_requirements": role_requirements,
+            "jd_name": jd_name,
+            "cutoff_score": cutoff_score,
+            "add_to_talent_pool": add_to_talent_pool,
+        }
+        job_id = content_hash(
+            hashlib.sha256(resume).hexdigest(), hashlib.sha256(jd or b"").hexdigest(),
+            json.dumps(role_requirements), str(cutoff_score),
+        )[:32]
+        now = time.time()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT OR IGNORE INTO jobs (id, status, stage, request, resume, jd, created_at, updated_at) "
+                "VALUES (?, 'queued', 'queued', ?, ?, ?, ?, ?)",
+                (job_id, json.dumps(request), resume, jd, now, now),
+            )
+            # A failed job is retried when it is submitted again
+            conn.execute(
+                "UPDATE jobs SET status = 'queued', stage = 'queued', done = NULL, total = NULL, error = NULL, "
+                "attempts = 0, request = ?, resume = ?, jd = ?, updated_at = ? WHERE id = ? AND status = 'failed'",
+                (json.dumps(request), resume, jd, now, job_id),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return job_id
+
+    def get(self, job_id):
+        """Status, progress and, once done, the result of a job; None for an unknown job"""
+        row = self._connect().execute(
+            "SELECT id, status, stage, done, total, result, error, created_at, updated_at FROM jobs WHERE id = ?",
+            (job_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def claim(self, worker):
+        """Mark the oldest queued job as running and return it with its inputs and claim token, or None"""
+        token = uuid.uuid4().hex
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT id, request, resume, jd FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE jobs SET status = 'running', worker = ?, claim_token = ?, attempts = attempts + 1, "
+                    "updated_at = ? WHERE id = ?",
+                    (worker, token, time.time(), row["id"]),
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        if row is None:
+            return None
+        return {"id": row["id"], "token": token, "request": json.loads(row["request"]), "resume": row["resume"],
+                "jd": row["jd"]}
+
+    # Writes for a job only apply while the caller still holds its claim; once a stale job is
+    # requeued and claimed again, the earlier worker's updates are ignored
+
+    def update_progress(self, job_id, token, stage, done=None, total=None):
+        """Record the stage of a running job; best effort, so a busy database never fails the analysis"""
+        try:
+            self._connect().execute(
+                "UPDATE jobs SET stage = ?, done = ?, total = ?, updated_at = ? "
+                "WHERE id = ? AND status = 'running' AND claim_token = ?",
+                (stage, done, total, time.time(), job_id, token),
+            )
+        except sqlite3.Error:
+            logger.warning("Could not record progress of job %s", job_id, exc_info=True)
+
+    def finish(self, job_id, token, result):
+        """Store the result of a claimed job; False if the claim was lost"""
+        # Inputs are dropped once the result is stored
+        return self._connect().execute(
+            "UPDATE jobs SET status = 'done', stage = 'done', done = NULL, total = NULL, result = ?, "
+            "resume = NULL, jd = NULL, updated_at = ? WHERE id = ? AND status = 'running' AND claim_token = ?",
+            (json.dumps(result), time.time(), job_id, token),
+        ).rowcount == 1
+
+    def fail(self, job_id, token, error):
+        """Mark a claimed job as failed; False if the claim was lost"""
+        return self._connect().execute(
+            "UPDATE jobs SET status = 'failed', error = ?, updated_at = ? "
+            "WHERE id = ? AND status = 'running' AND claim_token = ?",
+            (error, time.time(), job_id, token),
+        ).rowcount == 1
+
+    def delete(self, job_id):
+        self._connect().execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+
+    def requeue_stale(self):
+        """Requeue running jobs whose worker stopped reporting and delete expired finished jobs"""
+        now = time.time()
+        conn = self._connect()
+        conn.execute(
+            "UPDATE jobs SET status = 'failed', error = 'The analysis stopped responding', updated_at = ? "
+            "WHERE status = 'running' AND updated_at < ? AND attempts >= ?",
+            (now, now - JOB_STALE_AFTER, JOB_MAX_ATTEMPTS),
+        )
+        requeued = conn.execute(
+            "UPDATE jobs SET status = 'queued', stage = 'queued', done = NULL, total = NULL, updated_at = ? "
+            "WHERE status = 'running' AND updated_at < ?",
+            (now, now - JOB_STALE_AFTER),
+        ).rowcount
+        conn.execute(
+            "DELETE FROM jobs WHERE status IN ('done', 'failed') AND updated_at < ?",
+            (now - JOB_RETENTION,),
+        )
+        return requeued
+
+
+def _named_file(name, data):
+    document = io.BytesIO(data)
+    document.name = name
+    return document
+
+
+def run_job(queue, job):
+    """Run one claimed job to completion, recording its progress, result or error"""
+    from agents import ResumeAnalysisAgent
+    from pdf_extraction import DocumentExtractionError
+
+    request = job["request"]
+    agent = ResumeAnalysisAgent(
+        api_key=None,
+        cutoff_score=request["cutoff_score"],
+        progress_callback=lambda stage, done, total: queue.update_progress(
+            job["id"], job["token"], stage, done, total
+        ),
+    )
+    result = error = None
+    try:
+        custom_jd = _named_file(request["jd_name"], job["jd"]) if job["jd"] is not None else None
+        result = agent.analyze_resume(
+            _named_file(request["resume_name"], job["resume"]),
+            role_requirements=request["role_requirements"],
+            custom_jd=custom_jd,
+        )
+        if not result:
+            error = "No skills found to analyze against"
+        elif request.get("add_to_talent_pool"):
+            from talent_pool import get_talent_pool
+            agent.add_to_talent_pool(get_talent_pool(), name=request["resume_name"])
+    except DocumentExtractionError as e:
+        error = str(e)
+    except Exception as e:
+        logger.exception("Analysis job %s failed", job["id"])
+        error = str(e) or type(e).__name__
+    finally:
+        agent.cleanup()
+
+    if error:
+        recorded = queue.fail(job["id"], job["token"], error)
+    else:
+        recorded = queue.finish(job["id"], job["token"], result)
+    if not recorded:
+        logger.warning("Job %s was claimed again by another worker; discarding this run", job["id"])
+
+
+def _work(queue, worker):
+    checked_at = 0
+    while True:
+        try:
+            if time.monotonic() - checked_at > JOB_STALE_AFTER / 10:
+                checked_at = time.monotonic()
+                queue.requeue_stale()
+            job = queue.claim(worker)
+        except sqlite3.Error:
+            logger.exception("Job queue unavailable")
+            job = None
+        if job is None:
+            time.sleep(JOB_POLL_INTERVAL)
+            continue
+        # The worker must outlive any job; a job left running is requeued once it goes stale
+        try:
+            run_job(queue, job)
+        except Exception:
+            logger.exception("Worker %s could not complete job %s", worker, job["id"])
+
+
+_queue = None
+_workers_started = False
+_lock = threading.Lock()
+
+
+def get_job_queue():
+    """Process-wide job queue"""
+    global _queue
+    with _lock:
+        if _queue is None:
+            _queue = JobQueue()
+        return _queue
+
+
+def start_workers(count=JOB_WORKERS):
+    """Start the background workers of this process once; returns the queue they serve"""
+    global _workers_started
+    queue = get_job_queue()
+    with _lock:
+        if not _workers_started:
+            _workers_started = True
+            prefix = uuid.uuid4().hex[:8]
+            for index in range(count):
+                threading.Thread(
+                    target=_work, args=(queue, f"{prefix}-{index}"), name=f"job-worker-{index}", daemon=True
+                ).start()
+    return queue
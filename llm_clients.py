@@ -0,0 +1,123 @@
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+import weakref
+
+from dotenv import load_dotenv
+
+from cache import get_embedding_cache
+
+load_dotenv()
+google_api_key = os.getenv("GOOGLE_API_KEY")
+
+# Model configuration shared by every LLM and embedding call
+LLM_MODEL = "gemini-2.0-flash-lite"
+LLM_TEMPERATURE = 0.2
+EMBEDDING_MODEL = "models/embedding-001"
+
+
+def _create_llm(temperature):
+    # The Google SDKs take over a second to import, so they load on first use
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    return ChatGoogleGenerativeAI(
+        model=LLM_MODEL,
+        google_api_key=google_api_key,
+        temperature=temperature,
+        convert_system_message_to_human=True,  # Often helpful for Gemini compatibility
+        max_retries=1,  # Retries are left to the scheduler
+    )
+
+
+def _scheduled_llm(temperature, priority=None):
+    from scheduled_models import ScheduledChatModel
+    from scheduler import LLM_SCHEDULER
+
+    return ScheduledChatModel(model=_create_llm(temperature), scheduler=LLM_SCHEDULER, priority=priority)
+
+
+@functools.lru_cache(maxsize=None)
+def get_llm(temperature=LLM_TEMPERATURE, priority=None):
+    """Process-wide chat model for synchronous calls; reuses its HTTP connections"""
+    return _scheduled_llm(temperature, priority)
+
+
+_loop_clients = weakref.WeakKeyDictionary()
+_loop_clients_lock = threading.Lock()
+
+
+def _get_loop_client(key, factory):
+    # Async transports are bound to the loop they were created on, so one
+    # client is kept per loop and dropped together with it
+    loop = asyncio.get_running_loop()
+    with _loop_clients_lock:
+        clients = _loop_clients.setdefault(loop, {})
+        if key not in clients:
+            clients[key] = factory()
+        return clients[key]
+
+
+def get_async_llm(temperature=LLM_TEMPERATURE):
+    """Chat model for ainvoke/astream calls on the running event loop"""
+    return _get_loop_client(("llm", temperature), lambda: _scheduled_llm(temperature))
+
+
+def _create_embeddings():
+    from langchain_google_genai import GoogleGenerativeAIEmbeddings
+
+    return GoogleGenerativeAIEmbeddings(
+        model=EMBEDDING_MODEL,
+        google_api_key=google_api_key
+    )
+
+
+def _cached_embeddings():
+    from cached_embeddings import CachedEmbeddings
+    from scheduled_models import ScheduledEmbeddings
+    from scheduler import EMBEDDING_SCHEDULER
+
+    # Only cache misses reach the scheduler
+    embeddings = ScheduledEmbeddings(_create_embeddings(), EMBEDDING_SCHEDULER)
+    return CachedEmbeddings(embeddings, EMBEDDING_MODEL, get_embedding_cache())
+
+
+@functools.lru_cache(maxsize=None)
+def get_embeddings():
+    """Process-wide embedding model backed by the persistent embedding cache"""
+    return _cached_embeddings()
+
+
+def get_async_embeddings():
+    """Cached embedding model for aembed calls on the running event loop"""
+    return _get_loop_client(("embeddings",), _cached_embeddings)
+
+
+_background_loop = None
+_background_loop_lock = threading.Lock()
+
+
+def run_sync(coro):
+    """Run a coroutine to completion from synchronous code.
+
+    Coroutines run on one long-lived background loop so that the async
+    clients created on it (and their connections) are reused across calls.
+    The caller's context variables, such as the scheduler priority and the
+    open telemetry span, are carried over to the coroutine.
+    """
+    global _background_loop
+    with _background_loop_lock:
+        if _background_loop is None:
+            _background_loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=_background_loop.run_forever, name="llm-clients-loop", daemon=True
+            ).start()
+    return asyncio.run_coroutine_threadsafe(_in_context(contextvars.copy_context(), coro), _background_loop).result()
+
+
+async def _in_context(context, coro):
+    # The task has its own copy of the loop thread's context; set the caller's values in it
+    for var, value in context.items():
+        var.set(value)
+    return await coro
@@ -0,0 +1,211 @@
+import io
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+# Later prompts only need the start of a resume, so parsing stops early at these limits
+MAX_PDF_PAGES = int(os.getenv("MAX_PDF_PAGES", "30"))
+MAX_TEXT_CHARS = int(os.getenv("MAX_TEXT_CHARS", "100000"))
+PDF_TIME_LIMIT = float(os.getenv("PDF_TIME_LIMIT", "20"))
+
+# Hard limits enforced on the worker processes that parse PDFs
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(os.cpu_count() or 2)))
+PDF_HARD_TIMEOUT = float(os.getenv("PDF_HARD_TIMEOUT", "30"))
+PDF_MEMORY_LIMIT_MB = int(os.getenv("PDF_MEMORY_LIMIT_MB", "512"))
+
+
+class DocumentExtractionError(Exception):
+    """Structured failure from document text extraction"""
+
+    def __init__(self, code, message, filename=None):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.filename = filename
+
+    def __str__(self):
+        prefix = f"{self.filename}: " if self.filename else ""
+        return f"{prefix}{self.message} ({self.code})"
+
+    def to_dict(self):
+        return {"code": self.code, "message": self.message, "filename": self.filename}
+
+
+def iter_pdf_pages(pdf_file, max_pages=MAX_PDF_PAGES, max_chars=MAX_TEXT_CHARS, time_limit=PDF_TIME_LIMIT):
+    """Yield the text of each page, stopping at the page, character or time limit.
+
+    pdf_file may be a path or any seekable binary stream (such as a Streamlit
+    upload); the stream is read in place rather than copied into a new buffer.
+    """
+    import PyPDF2
+
+    if hasattr(pdf_file, "seek"):
+        pdf_file.seek(0)
+    reader = PyPDF2.PdfReader(pdf_file)
+
+    deadline = time.monotonic() + time_limit
+    remaining = max_chars
+    # reader.pages is lazy, so pages past the limits are never parsed
+    for page_number, page in enumerate(reader.pages):
+        if page_number >= max_pages or remaining <= 0:
+            break
+        if time.monotonic() > deadline:
+            logger.warning("PDF extraction stopped after %d pages: time limit of %ss reached", page_number, time_limit)
+            break
+
+        text = (page.extract_text() or "")[:remaining]
+        remaining -= len(text)
+        yield text
+
+
+def extract_pdf_text(pdf_file, max_pages=MAX_PDF_PAGES, max_chars=MAX_TEXT_CHARS, time_limit=PDF_TIME_LIMIT):
+    """Extract text from a PDF in one pass, joining pages once at the end"""
+    return "\n".join(iter_pdf_pages(pdf_file, max_pages, max_chars, time_limit))
+
+
+def _worker_main(conn, memory_limit_mb):
+    # Runs in a child process: parse one document per request until the pipe closes
+    if resource is not None and memory_limit_mb:
+        limit = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+    while True:
+        try:
+            data = conn.recv_bytes()
+            max_pages, max_chars, time_limit = conn.recv()
+        except (EOFError, OSError):
+            return
+
+        try:
+            text = extract_pdf_text(io.BytesIO(data), max_pages, max_chars, time_limit)
+            reply = ("ok", text)
+        except MemoryError:
+            reply = ("error", "memory_limit", f"PDF parsing exceeded the {memory_limit_mb} MB memory limit")
+        except Exception as e:
+            reply = ("error", "invalid_pdf", f"Could not parse PDF: {e}")
+        del data
+        conn.send(reply)
+
+
+def _read_document(pdf_file):
+    if hasattr(pdf_file, "getbuffer"):
+        # Uploads are BytesIO objects; send their buffer without an intermediate copy
+        return pdf_file.getbuffer()
+    if hasattr(pdf_file, "read"):
+        pdf_file.seek(0)
+        return pdf_file.read()
+    with open(pdf_file, "rb") as f:
+        return f.read()
+
+
+class PDFWorkerPool:
+    """Reusable pool of PDF parsing processes.
+
+    Each document is parsed by one worker under a hard timeout and an address
+    space limit. A worker that times out or dies is killed and replaced, so a
+    pathological PDF only ever costs its own request.
+    """
+
+    def __init__(self, size=PDF_WORKERS, timeout=PDF_HARD_TIMEOUT, memory_limit_mb=PDF_MEMORY_LIMIT_MB):
+        self.size = size
+        self.timeout = timeout
+        self.memory_limit_mb = memory_limit_mb
+        self._context = multiprocessing.get_context("spawn")
+        self._idle = queue.Queue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def _spawn(self):
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main, args=(child_conn, self.memory_limit_mb), daemon=True
+        )
+        process.start()
+        child_conn.close()
+        return process, parent_conn
+
+    def _acquire(self):
+        self._slots.acquire()
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            return self._spawn()
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _release(self, worker):
+        self._idle.put(worker)
+        self._slots.release()
+
+    def _kill(self, worker):
+        process, conn = worker
+        process.kill()
+        process.join()
+        conn.close()
+
+    def _discard(self, worker):
+        self._kill(worker)
+        self._slots.release()
+
+    def extract(self, pdf_file, filename=None, max_pages=MAX_PDF_PAGES, max_chars=MAX_TEXT_CHARS,
+                time_limit=PDF_TIME_LIMIT):
+        """Extract text from a PDF in a worker process or raise DocumentExtractionError"""
+        data = _read_document(pdf_file)
+        worker = self._acquire()
+        process, conn = worker
+        try:
+            try:
+                conn.send_bytes(data)
+                conn.send((max_pages, max_chars, time_limit))
+                if not conn.poll(self.timeout):
+                    self._discard(worker)
+                    raise DocumentExtractionError(
+                        "timeout", f"PDF parsing did not finish within {self.timeout}s", filename
+                    )
+                reply = conn.recv()
+            except (EOFError, OSError):
+                self._discard(worker)
+                raise DocumentExtractionError(
+                    "worker_crashed", f"PDF worker exited unexpectedly (exit code {process.exitcode})", filename
+                )
+        finally:
+            if isinstance(data, memoryview):
+                data.release()
+
+        self._release(worker)
+        if reply[0] == "error":
+            raise DocumentExtractionError(reply[1], reply[2], filename)
+        return reply[1]
+
+    def close(self):
+        """Stop the idle workers"""
+        while True:
+            try:
+                self._kill(self._idle.get_nowait())
+            except queue.Empty:
+                return
+
+
+_pdf_pool = None
+_pdf_pool_lock = threading.Lock()
+
+
+def get_pdf_pool():
+    """Process-wide PDF worker pool shared by all sessions"""
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is None:
+            _pdf_pool = PDFWorkerPool()
+        return _pdf_pool
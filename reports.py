@@ -0,0 +1,128 @@
+import collections
+import csv
+import io
+import json
+import threading
+
+# Rendered reports kept in memory, keyed by analysis ID and format
+REPORT_CACHE_SIZE = 128
+
+CSV_FIELDS = ["analysis_id", "skill", "score", "status", "reasoning", "overall_score", "cutoff_score", "selected"]
+
+
+def _clean_detail(detail):
+    # Weakness details sometimes come back as raw JSON from the LLM
+    if detail.startswith('```json') or '{' in detail:
+        return "The resume lacks examples of this skill."
+    return detail
+
+
+def build_text_report(analysis_result):
+    """Human readable report of an analysis result"""
+    strengths = analysis_result.get("strengths", [])
+    missing_skills = analysis_result.get("missing_skills", [])
+    lines = [
+        "",
+        "# Resume Analysis Report",
+        "",
+        f"## Overall Score: {analysis_result.get('overall_score', 0)}/100",
+        "",
+        f"Status: {'✅ Shortlisted' if analysis_result.get('selected') else '❌ Not Selected'}",
+        "",
+        "## Analysis Reasoning",
+        analysis_result.get("reasoning", "No reasoning provided."),
+        "",
+        "## Strengths",
+        ", ".join(strengths or ["None identified"]),
+        "",
+        "## Areas for Improvement",
+        ", ".join(missing_skills or ["None identified"]),
+        "",
+        "## Detailed Weakness Analysis",
+    ]
+    for weakness in analysis_result.get("detailed_weaknesses", []):
+        detail = _clean_detail(weakness.get("detail", "No specific details provided."))
+        lines += ["", f"### {weakness.get('skill', '')} (Score: {weakness.get('score', 0)}/10)", f"Issue: {detail}"]
+        if weakness.get("suggestions"):
+            lines += ["", "Improvement suggestions:"]
+            lines += [f"- {suggestion}" for suggestion in weakness["suggestions"]]
+        if weakness.get("example"):
+            lines += ["", f"Example: {weakness['example']}"]
+    lines += ["", "---", "Analysis provided by Recruitment Agent"]
+    return "\n".join(lines)
+
+
+def build_json_report(analysis_result):
+    """Structured report for programmatic import"""
+    skill_reasoning = analysis_result.get("skill_reasoning", {})
+    report = {
+        "analysis_id": analysis_result.get("analysis_id"),
+        "overall_score": analysis_result.get("overall_score", 0),
+        "cutoff_score": analysis_result.get("cutoff_score"),
+        "selected": analysis_result.get("selected", False),
+        "reasoning": analysis_result.get("reasoning", ""),
+        "strengths": analysis_result.get("strengths", []),
+        "missing_skills": analysis_result.get("missing_skills", []),
+        "skills": [
+            {"skill": skill, "score": score, "reasoning": skill_reasoning.get(skill, "")}
+            for skill, score in analysis_result.get("skill_scores", {}).items()
+        ],
+        "weaknesses": analysis_result.get("detailed_weaknesses", []),
+    }
+    return json.dumps(report, indent=2, ensure_ascii=False)
+
+
+def build_csv_report(analysis_result):
+    """One row per scored skill, for ATS imports"""
+    strengths = set(analysis_result.get("strengths", []))
+    missing_skills = set(analysis_result.get("missing_skills", []))
+    skill_reasoning = analysis_result.get("skill_reasoning", {})
+
+    output = io.StringIO()
+    writer = csv.DictWriter(output, fieldnames=CSV_FIELDS)
+    writer.writeheader()
+    for skill, score in analysis_result.get("skill_scores", {}).items():
+        writer.writerow({
+            "analysis_id": analysis_result.get("analysis_id", ""),
+            "skill": skill,
+            "score": score,
+            "status": "strength" if skill in strengths else "missing" if skill in missing_skills else "partial",
+            "reasoning": skill_reasoning.get(skill, ""),
+            "overall_score": analysis_result.get("overall_score", 0),
+            "cutoff_score": analysis_result.get("cutoff_score", ""),
+            "selected": analysis_result.get("selected", False),
+        })
+    return output.getvalue()
+
+
+# format: (builder, MIME type, file extension)
+REPORT_FORMATS = {
+    "txt": (build_text_report, "text/plain", "txt"),
+    "json": (build_json_report, "application/json", "json"),
+    "csv": (build_csv_report, "text/csv", "csv"),
+}
+
+
+_rendered = collections.OrderedDict()
+_rendered_lock = threading.Lock()
+
+
+def render_report(analysis_result, fmt="txt"):
+    """Report bytes in the given format, built once per analysis ID and format"""
+    if fmt not in REPORT_FORMATS:
+        raise ValueError(f"Unknown report format: {fmt}")
+    analysis_id = analysis_result.get("analysis_id")
+    if analysis_id is None:
+        return REPORT_FORMATS[fmt][0](analysis_result).encode("utf-8")
+
+    key = (analysis_id, fmt)
+    with _rendered_lock:
+        if key in _rendered:
+            _rendered.move_to_end(key)
+            return _rendered[key]
+    report = REPORT_FORMATS[fmt][0](analysis_result).encode("utf-8")
+    with _rendered_lock:
+        _rendered[key] = report
+        while len(_rendered) > REPORT_CACHE_SIZE:
+            _rendered.popitem(last=False)
+    return report
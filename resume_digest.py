@@ -0,0 +1,92 @@
+import os
+import re
+
+from skill_matcher import heading_section
+
+# Upper bound on the digest sent in place of the full resume; shorter resumes are sent whole
+RESUME_DIGEST_MAX_CHARS = int(os.getenv("RESUME_DIGEST_MAX_CHARS", "1200"))
+
+# Upper bound on the retrieved lines added after the digest in one prompt
+RESUME_EXCERPT_MAX_CHARS = int(os.getenv("RESUME_EXCERPT_MAX_CHARS", "800"))
+
+# Digest lines longer than this are cut at a word boundary
+DIGEST_LINE_CHARS = 140
+
+BULLET_PATTERN = re.compile(r"^[\s\-•*▪●◦·>]+")
+
+
+def compact_line(line):
+    """Line without bullet markers and repeated whitespace"""
+    return " ".join(BULLET_PATTERN.sub("", line).split())
+
+
+def split_sections(text):
+    """[(heading, [(line, is_bullet)])] in resume order; lines before the first heading have an empty heading"""
+    sections = [("", [])]
+    for raw_line in text.splitlines():
+        line = compact_line(raw_line)
+        if not line:
+            continue
+        if heading_section(line):
+            sections.append((line, []))
+        else:
+            sections[-1][1].append((line, bool(BULLET_PATTERN.match(raw_line.strip()))))
+    return [(heading, lines) for heading, lines in sections if heading or lines]
+
+
+def shorten(line, max_chars=DIGEST_LINE_CHARS):
+    if len(line) <= max_chars:
+        return line
+    return line[:max_chars].rsplit(" ", 1)[0] + "..."
+
+
+def _render(sections):
+    return "\n\n".join(
+        "\n".join([heading, *(line for line, _ in lines)] if heading else [line for line, _ in lines])
+        for heading, lines in sections
+    )
+
+
+def build_resume_digest(text, max_chars=RESUME_DIGEST_MAX_CHARS):
+    """Section-aware extract of a resume within max_chars; returns (digest, whether it is the whole resume)"""
+    sections = split_sections(text)
+    full = _render(sections)
+    if len(full) <= max_chars:
+        return full, True
+
+    # Headings are always kept. Within a section, entry lines (job titles, degrees) come before
+    # bullets, and lines are taken breadth-first across sections so no section is crowded out.
+    candidates = [
+        sorted(((position, shorten(line)) for position, (line, _) in enumerate(lines)),
+               key=lambda item: lines[item[0]][1])
+        for _, lines in sections
+    ]
+    kept = [[] for _ in sections]
+    used = sum(len(heading) + 2 for heading, _ in sections)
+    for depth in range(max(len(lines) for lines in candidates)):
+        for index, lines in enumerate(candidates):
+            if depth < len(lines) and used + len(lines[depth][1]) + 1 <= max_chars:
+                kept[index].append(lines[depth])
+                used += len(lines[depth][1]) + 1
+    return _render([
+        (heading, [(line, False) for _, line in sorted(lines)]) for (heading, _), lines in zip(sections, kept)
+    ]), False
+
+
+def format_resume_context(digest, chunks, max_chars=RESUME_EXCERPT_MAX_CHARS):
+    """Digest followed by the lines of the retrieved chunks it does not already contain"""
+    seen = set(digest.splitlines())
+    excerpt_lines = []
+    used = 0
+    for chunk in chunks:
+        for raw_line in chunk.splitlines():
+            line = compact_line(raw_line)
+            # Lines the digest shortened count as already present
+            if not line or shorten(line) in seen or used + len(line) + 1 > max_chars:
+                continue
+            seen.add(shorten(line))
+            excerpt_lines.append(line)
+            used += len(line) + 1
+    if not excerpt_lines:
+        return digest
+    return digest + "\n\nRelevant excerpts:\n" + "\n".join(excerpt_lines)
@@ -0,0 +1,75 @@
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+# Role requirements dictionary shared by the Streamlit app and bulk screening
+ROLE_REQUIREMENTS = {
+    "AI/ML Engineer": [
+        "Python", "LLM", "Machine Learning",
+        "Langchain", "Scikit-Learn", "NLP", "RAG",
+        "Hugging Face", "Feature Engineering", "Generative AI"
+    ],
+    "Frontend Engineer": [
+        "React", "Vue", "Angular", "HTML5", "CSS3", "JavaScript", "TypeScript",
+        "Next.js", "Svelte", "Bootstrap", "Tailwind CSS", "GraphQL", "Redux",
+        "WebAssembly", "Three.js", "Performance Optimization"
+    ],
+    "Backend Engineer": [
+        "Python", "Java", "Node.js", "REST APIs", "Cloud services", "Kubernetes",
+        "Docker", "GraphQL", "Microservices", "gRPC", "Spring Boot", "Flask",
+        "FastAPI", "SQL & NoSQL Databases", "Redis", "RabbitMQ", "CI/CD"
+    ],
+    "Data Engineer": [
+        "Python", "SQL", "Apache Spark", "Hadoop", "Kafka", "ETL Pipelines",
+        "Airflow", "BigQuery", "Redshift", "Data Warehousing", "Snowflake",
+        "Azure Data Factory", "GCP", "AWS Glue", "DBT"
+    ],
+    "DevOps Engineer": [
+        "Kubernetes", "Docker", "Terraform", "CI/CD", "AWS", "Azure", "GCP",
+        "Jenkins", "Ansible", "Prometheus", "Grafana", "Helm", "Linux Administration",
+        "Networking", "Site Reliability Engineering (SRE)"
+    ],
+    "Full Stack Developer": [
+        "JavaScript", "TypeScript", "React", "Node.js", "Express", "MongoDB",
+        "SQL", "HTML5", "CSS3", "RESTful APIs", "Git", "CI/CD", "Cloud Services",
+        "Responsive Design", "Authentication & Authorization"
+    ],
+    "Product Manager": [
+        "Product Strategy", "User Research", "Agile Methodologies", "Roadmapping",
+        "Market Analysis", "Stakeholder Management", "Data Analysis", "User Stories",
+        "Product Lifecycle", "A/B Testing", "KPI Definition", "Prioritization",
+        "Competitive Analysis", "Customer Journey Mapping"
+    ],
+    "Data Scientist": [
+        "Python", "R", "SQL", "Machine Learning", "Statistics", "Data Visualization",
+        "Pandas", "NumPy", "Scikit-learn", "Jupyter", "Hypothesis Testing",
+        "Experimental Design", "Feature Engineering", "Model Evaluation"
+    ]
+}
+
+
+def normalize_skill(skill):
+    """Lowercase a skill name and collapse whitespace for matching"""
+    return re.sub(r"\s+", " ", skill.strip().lower())
+
+
+# Derived once at import instead of on every analysis
+ALL_ROLE_SKILLS = list(dict.fromkeys(skill for skills in ROLE_REQUIREMENTS.values() for skill in skills))
+
+
+def precompute_role_data():
+    """Warm the embedding cache with everything derivable from the static role lists"""
+    from llm_clients import get_embeddings, google_api_key
+
+    if not google_api_key:
+        logger.warning("GOOGLE_API_KEY is not set; skipping role skill embedding precompute")
+        return
+
+    # Skill names are embedded as documents by weakness retrieval and embedding scoring. Batched
+    # scoring queries are not warmed: their groups depend on which skills each resume leaves ambiguous.
+    get_embeddings().embed_documents(ALL_ROLE_SKILLS)
+
+
+if __name__ == "__main__":
+    precompute_role_data()
@@ -0,0 +1,58 @@
+from typing import Any, Optional
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+
+
+class ScheduledChatModel(BaseChatModel):
+    """Chat model that sends every generate and stream call of another model through a Scheduler"""
+
+    model: BaseChatModel
+    scheduler: Any
+    # Fixed priority for every call; None uses the priority of the calling context
+    priority: Optional[str] = None
+
+    @property
+    def _llm_type(self):
+        return f"scheduled-{self.model._llm_type}"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        return self.scheduler.call(
+            lambda: self.model._generate(messages, stop=stop, run_manager=run_manager, **kwargs), self.priority
+        )
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        return await self.scheduler.acall(
+            lambda: self.model._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs), self.priority
+        )
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        yield from self.scheduler.stream(
+            lambda: self.model._stream(messages, stop=stop, run_manager=run_manager, **kwargs), self.priority
+        )
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        async for chunk in self.scheduler.astream(
+            lambda: self.model._astream(messages, stop=stop, run_manager=run_manager, **kwargs), self.priority
+        ):
+            yield chunk
+
+
+class ScheduledEmbeddings(Embeddings):
+    """Embeddings whose API calls go through a Scheduler"""
+
+    def __init__(self, underlying, scheduler):
+        self.underlying = underlying
+        self.scheduler = scheduler
+
+    def embed_documents(self, texts):
+        return self.scheduler.call(lambda: self.underlying.embed_documents(texts))
+
+    def embed_query(self, text):
+        return self.scheduler.call(lambda: self.underlying.embed_query(text))
+
+    async def aembed_documents(self, texts):
+        return await self.scheduler.acall(lambda: self.underlying.aembed_documents(texts))
+
+    async def aembed_query(self, text):
+        return await self.scheduler.acall(lambda: self.underlying.aembed_query(text))
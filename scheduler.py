@@ -0,0 +1,308 @@
+import asyncio
+import collections
+import contextlib
+import contextvars
+import logging
+import os
+import random
+import threading
+import time
+
+import telemetry
+
+logger = logging.getLogger(__name__)
+
+# Queues drained in this order: interactive Q&A first, bulk screening last
+PRIORITIES = ("interactive", "default", "bulk")
+
+# Request rate (token bucket, 0 disables) and the ceiling of the adaptive concurrency window
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "4000"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+EMBEDDING_REQUESTS_PER_MINUTE = float(os.getenv("EMBEDDING_REQUESTS_PER_MINUTE", "1500"))
+EMBEDDING_MAX_CONCURRENCY = int(os.getenv("EMBEDDING_MAX_CONCURRENCY", "8"))
+
+# Attempts per call including the first; retries wait a random time up to the capped exponential backoff
+MAX_ATTEMPTS = int(os.getenv("LLM_MAX_ATTEMPTS", "5"))
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 20.0
+
+THROTTLED_STATUS = {429}
+TRANSIENT_STATUS = {500, 502, 503, 504}
+THROTTLED_ERRORS = {"ResourceExhausted", "TooManyRequests", "RateLimitError"}
+TRANSIENT_ERRORS = {"ServiceUnavailable", "DeadlineExceeded", "InternalServerError", "GatewayTimeout"}
+
+_priority = contextvars.ContextVar("scheduler_priority", default="default")
+
+
+@contextlib.contextmanager
+def priority(name):
+    """Run the calls made inside the block, including in tasks it starts, at the given priority"""
+    if name not in PRIORITIES:
+        raise ValueError(f"Unknown priority: {name}")
+    token = _priority.set(name)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def error_kind(exc):
+    """"throttled" for quota errors, "transient" for retryable server errors, None otherwise"""
+    # SDK wrappers keep the HTTP error as the cause
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        status = getattr(exc, "status_code", None) or getattr(exc, "code", None)
+        if status in THROTTLED_STATUS or type(exc).__name__ in THROTTLED_ERRORS:
+            return "throttled"
+        if status in TRANSIENT_STATUS or type(exc).__name__ in TRANSIENT_ERRORS \
+                or isinstance(exc, (TimeoutError, ConnectionError)):
+            return "transient"
+        exc = exc.__cause__ or exc.__context__
+    return None
+
+
+def backoff_delay(attempt, exc=None):
+    """Full-jitter exponential backoff, never shorter than a server supplied retry delay"""
+    delay = random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+    retry_after = getattr(exc, "retry_after", None)
+    if isinstance(retry_after, (int, float)):
+        delay = max(delay, min(float(retry_after), BACKOFF_MAX))
+    return delay
+
+
+class TokenBucket:
+    """Refills rate tokens per second up to capacity; not thread-safe on its own"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def take(self):
+        """Take a token and return 0, or return the seconds until one is available"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def drain(self):
+        self.tokens = min(self.tokens, 0)
+
+
+class _Waiter:
+    __slots__ = ("priority", "granted", "event", "loop", "future")
+
+    def __init__(self, priority, loop=None):
+        self.priority = priority
+        self.granted = False
+        self.loop = loop
+        if loop is None:
+            self.event = threading.Event()
+            self.future = None
+        else:
+            self.event = None
+            self.future = loop.create_future()
+
+    def grant(self):
+        self.granted = True
+        if self.event is not None:
+            self.event.set()
+        else:
+            self.loop.call_soon_threadsafe(self._resolve)
+
+    def _resolve(self):
+        if not self.future.done():
+            self.future.set_result(None)
+
+
+class Scheduler:
+    """Shared admission control for one API: token bucket, AIMD concurrency window and priority queues"""
+
+    def __init__(self, name, requests_per_minute, max_concurrency, min_concurrency=1):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.limit = float(max(min_concurrency, max_concurrency // 2))
+        self.in_flight = 0
+        self.bucket = TokenBucket(requests_per_minute / 60, max_concurrency) if requests_per_minute > 0 else None
+        self.queues = {level: collections.deque() for level in PRIORITIES}
+        self._lock = threading.Lock()
+        self._timer = None
+        self._decreased_at = 0.0
+
+    def _dispatch(self):
+        # Called with the lock held
+        while self.in_flight < int(self.limit):
+            queue = next((queue for queue in self.queues.values() if queue), None)
+            if queue is None:
+                break
+            if self.bucket is not None:
+                delay = self.bucket.take()
+                if delay:
+                    self._dispatch_later(delay)
+                    break
+            queue.popleft().grant()
+            self.in_flight += 1
+        self._report()
+
+    def _dispatch_later(self, delay):
+        if self._timer is None:
+            self._timer = threading.Timer(delay, self._on_timer)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _on_timer(self):
+        with self._lock:
+            self._timer = None
+            self._dispatch()
+
+    def _report(self):
+        for level, queue in self.queues.items():
+            telemetry.gauge("scheduler_queue_depth", len(queue), scheduler=self.name, priority=level)
+        telemetry.gauge("scheduler_in_flight", self.in_flight, scheduler=self.name)
+        telemetry.gauge("scheduler_concurrency_limit", round(self.limit, 2), scheduler=self.name)
+
+    def _enqueue(self, waiter):
+        with self._lock:
+            self.queues[waiter.priority].append(waiter)
+            self._dispatch()
+
+    def acquire(self, priority=None):
+        """Block until a slot is free; returns the time the slot was granted"""
+        waiter = _Waiter(priority or _priority.get())
+        queued = time.monotonic()
+        self._enqueue(waiter)
+        waiter.event.wait()
+        return self._granted(queued)
+
+    async def aacquire(self, priority=None):
+        """Async variant of acquire; a cancelled waiter gives up its place or its slot"""
+        waiter = _Waiter(priority or _priority.get(), asyncio.get_running_loop())
+        queued = time.monotonic()
+        self._enqueue(waiter)
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter.granted:
+                    self.in_flight -= 1
+                else:
+                    self.queues[waiter.priority].remove(waiter)
+                self._dispatch()
+            raise
+        return self._granted(queued)
+
+    def _granted(self, queued):
+        now = time.monotonic()
+        telemetry.observe("scheduler_wait_seconds", now - queued, scheduler=self.name)
+        return now
+
+    def release(self, outcome, started):
+        """Free a slot and adapt the window to the outcome of the call made in it"""
+        with self._lock:
+            self.in_flight -= 1
+            # AIMD: a success widens the window by about one slot per window of calls, a throttle halves it
+            if outcome == "ok":
+                self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+            elif outcome == "throttled" and started >= self._decreased_at:
+                # Calls already in flight when the window shrank do not shrink it again
+                self.limit = max(self.min_concurrency, self.limit / 2)
+                self._decreased_at = time.monotonic()
+                if self.bucket is not None:
+                    self.bucket.drain()
+            self._dispatch()
+
+    def _should_retry(self, outcome, attempt, exc):
+        if outcome not in ("throttled", "transient") or attempt >= MAX_ATTEMPTS:
+            return False
+        telemetry.current_span().add("retries")
+        telemetry.count("scheduler_retries_total", scheduler=self.name, reason=outcome)
+        logger.warning("%s call %s (attempt %d/%d): %s", self.name, outcome, attempt, MAX_ATTEMPTS, exc)
+        return True
+
+    def call(self, func, priority=None):
+        """Run func() in a slot, retrying throttled and transient errors"""
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            started = self.acquire(priority)
+            outcome = "error"
+            try:
+                result = func()
+                outcome = "ok"
+                return result
+            except Exception as exc:
+                outcome = error_kind(exc) or "error"
+                if not self._should_retry(outcome, attempt, exc):
+                    raise
+                delay = backoff_delay(attempt, exc)
+            finally:
+                self.release(outcome, started)
+            time.sleep(delay)
+
+    async def acall(self, func, priority=None):
+        """Async variant of call for a function returning a coroutine"""
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            started = await self.aacquire(priority)
+            outcome = "error"
+            try:
+                result = await func()
+                outcome = "ok"
+                return result
+            except Exception as exc:
+                outcome = error_kind(exc) or "error"
+                if not self._should_retry(outcome, attempt, exc):
+                    raise
+                delay = backoff_delay(attempt, exc)
+            finally:
+                self.release(outcome, started)
+            await asyncio.sleep(delay)
+
+    def stream(self, make_iterator, priority=None):
+        """Yield from make_iterator() in one slot; retried only if it fails before its first item"""
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            started = self.acquire(priority)
+            outcome = "error"
+            produced = False
+            try:
+                for item in make_iterator():
+                    produced = True
+                    yield item
+                outcome = "ok"
+                return
+            except Exception as exc:
+                outcome = error_kind(exc) or "error"
+                if produced or not self._should_retry(outcome, attempt, exc):
+                    raise
+                delay = backoff_delay(attempt, exc)
+            finally:
+                self.release(outcome, started)
+            time.sleep(delay)
+
+    async def astream(self, make_iterator, priority=None):
+        """Async variant of stream for an async iterator"""
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            started = await self.aacquire(priority)
+            outcome = "error"
+            produced = False
+            try:
+                async for item in make_iterator():
+                    produced = True
+                    yield item
+                outcome = "ok"
+                return
+            except Exception as exc:
+                outcome = error_kind(exc) or "error"
+                if produced or not self._should_retry(outcome, attempt, exc):
+                    raise
+                delay = backoff_delay(attempt, exc)
+            finally:
+                self.release(outcome, started)
+            await asyncio.sleep(delay)
+
+
+LLM_SCHEDULER = Scheduler("llm", LLM_REQUESTS_PER_MINUTE, LLM_MAX_CONCURRENCY)
+EMBEDDING_SCHEDULER = Scheduler("embeddings", EMBEDDING_REQUESTS_PER_MINUTE, EMBEDDING_MAX_CONCURRENCY)
@@ -0,0 +1,167 @@
+import argparse
+import asyncio
+import csv
+import glob
+import os
+import time
+
+from agents import SCORING_MODES, ResumeAnalysisAgent
+from llm_clients import run_sync
+from pdf_extraction import DocumentExtractionError, PDFWorkerPool
+from roles import ROLE_REQUIREMENTS
+from scheduler import priority
+import telemetry
+from talent_pool import get_talent_pool
+
+RESUME_EXTENSIONS = (".pdf", ".txt")
+RANKING_FIELDS = ["rank", "candidate", "overall_score", "selected", "strengths", "missing_skills", "error_code", "error"]
+
+
+def find_resumes(paths):
+    """Expand files and directories into a sorted list of resume files"""
+    resumes = []
+    for path in paths:
+        if os.path.isdir(path):
+            for extension in RESUME_EXTENSIONS:
+                resumes.extend(glob.glob(os.path.join(path, f"*{extension}")))
+        elif path.lower().endswith(RESUME_EXTENSIONS):
+            resumes.append(path)
+    return sorted(set(resumes))
+
+
+def rank_rows(rows):
+    """Sort screening rows by score and assign ranks"""
+    ranked = sorted(rows, key=lambda row: (row["error"] == "", row["overall_score"]), reverse=True)
+    for rank, row in enumerate(ranked, start=1):
+        row["rank"] = rank
+    return ranked
+
+
+def write_ranking(rows, output_path):
+    """Atomically rewrite the ranked table so readers never see a partial file"""
+    tmp_path = f"{output_path}.tmp"
+    with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=RANKING_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+    os.replace(tmp_path, output_path)
+
+
+async def ascreen_resumes(resume_paths, role=None, jd_path=None, output_path=None,
+                          cutoff_score=75, concurrency=8, workers=None, analyze_weaknesses=False,
+                          scoring_mode="llm", talent_pool=None):
+    """Score many resumes against one role or JD and return them ranked"""
+    if jd_path:
+        jd_agent = ResumeAnalysisAgent(api_key=None)
+        jd_text = await asyncio.to_thread(jd_agent.extract_text_from_file, jd_path)
+        # Extracted once and shared by every candidate
+        skills = await jd_agent.aextract_skills_from_jd(jd_text)
+    elif role:
+        skills = ROLE_REQUIREMENTS[role]
+    else:
+        raise ValueError("Either a role or a job description is required")
+
+    if not skills:
+        raise ValueError("No skills found to screen against")
+
+    semaphore = asyncio.Semaphore(concurrency)
+    rows = []
+    started = time.monotonic()
+    pool = PDFWorkerPool(size=workers) if workers else PDFWorkerPool()
+    parse_slots = asyncio.Semaphore(pool.size)
+
+    def extract_text(agent, path):
+        if path.lower().endswith(".pdf"):
+            return pool.extract(path, filename=os.path.basename(path))
+        return agent.extract_text_from_txt(path)
+
+    async def screen(path):
+        row = {"rank": None, "candidate": os.path.basename(path), "overall_score": 0,
+               "selected": False, "strengths": "", "missing_skills": "", "error_code": "", "error": ""}
+        agent = ResumeAnalysisAgent(api_key=None, cutoff_score=cutoff_score, scoring_mode=scoring_mode)
+        try:
+            # Queued behind interactive calls made in the same process
+            with priority("bulk"):
+                async with parse_slots:
+                    resume_text = await asyncio.to_thread(extract_text, agent, path)
+                if not resume_text.strip():
+                    raise DocumentExtractionError("empty_document", "No text could be extracted", row["candidate"])
+                async with semaphore:
+                    result = await agent.aanalyze_resume_text(resume_text, skills, analyze_weaknesses)
+                row.update(
+                    overall_score=result["overall_score"],
+                    selected=result["selected"],
+                    strengths=", ".join(result["strengths"]),
+                    missing_skills=", ".join(result["missing_skills"]),
+                )
+                if talent_pool is not None:
+                    await asyncio.to_thread(agent.add_to_talent_pool, talent_pool, name=row["candidate"])
+        except DocumentExtractionError as e:
+            row.update(error_code=e.code, error=e.message)
+        except Exception as e:
+            row.update(error_code="analysis_failed", error=str(e) or type(e).__name__)
+        finally:
+            agent.cleanup()
+        return row
+
+    try:
+        for completed in asyncio.as_completed([screen(path) for path in resume_paths]):
+            rows.append(await completed)
+            rows = rank_rows(rows)
+            if output_path:
+                write_ranking(rows, output_path)
+
+            elapsed = time.monotonic() - started
+            print(f"Screened {len(rows)}/{len(resume_paths)} resumes "
+                  f"({len(rows) / elapsed * 60:.1f} resumes/min)")
+    finally:
+        pool.close()
+
+    return rows
+
+
+def screen_resumes(resume_paths, role=None, jd_path=None, output_path=None, **kwargs):
+    """Synchronous entry point for ascreen_resumes"""
+    return run_sync(ascreen_resumes(resume_paths, role, jd_path, output_path, **kwargs))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank a batch of resumes against one role or job description")
+    parser.add_argument("resumes", nargs="+", help="Resume files or directories containing PDF/TXT resumes")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--role", choices=sorted(ROLE_REQUIREMENTS), help="Role from the built-in role requirements")
+    target.add_argument("--jd", help="Job description file (PDF or TXT)")
+    parser.add_argument("--output", default="ranking.csv", help="CSV file the ranked table is streamed to")
+    parser.add_argument("--cutoff", type=int, default=75, help="Cutoff score for selection")
+    parser.add_argument("--concurrency", type=int, default=8, help="Candidates scored at the same time")
+    parser.add_argument("--workers", type=int, default=None, help="PDF parsing processes (default: CPU count)")
+    parser.add_argument("--weaknesses", action="store_true", help="Also run the detailed weakness analysis")
+    parser.add_argument("--talent-pool", action="store_true",
+                        help="Add every screened candidate to the persistent talent pool")
+    parser.add_argument("--mode", choices=SCORING_MODES, default="llm",
+                        help="Skill scoring: 'llm' or the cheaper LLM-free 'embedding' triage")
+    args = parser.parse_args()
+
+    resume_paths = find_resumes(args.resumes)
+    if not resume_paths:
+        parser.error("no PDF or TXT resumes found")
+
+    telemetry.start_metrics_server()
+
+    rows = screen_resumes(
+        resume_paths,
+        role=args.role,
+        jd_path=args.jd,
+        output_path=args.output,
+        cutoff_score=args.cutoff,
+        concurrency=args.concurrency,
+        workers=args.workers,
+        analyze_weaknesses=args.weaknesses,
+        scoring_mode=args.mode,
+        talent_pool=get_talent_pool() if args.talent_pool else None,
+    )
+    print(f"Wrote ranking of {len(rows)} candidates to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
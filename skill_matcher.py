@@ -0,0 +1,264 @@
+import bisect
+import functools
+import re
+from collections import deque
+
+from roles import ALL_ROLE_SKILLS, normalize_skill
+
+# Extra spellings for skills whose resume wording often differs from the role list
+SKILL_ALIASES = {
+    "kubernetes": ["k8s", "eks", "aks", "gke", "openshift"],
+    "docker": ["dockerized", "dockerised", "dockerfile", "dockerfiles", "docker compose"],
+    "git": ["github", "gitlab", "bitbucket"],
+    "sql": ["postgresql", "postgres", "mysql", "mariadb", "sqlite", "t-sql", "tsql", "pl/sql", "plsql", "mssql"],
+    "react": ["reactjs", "react.js", "react js", "react native"],
+    "angular": ["angularjs", "angular.js", "angular js"],
+    "vue": ["vuejs", "vue.js", "vue js", "nuxt", "nuxt.js"],
+    "express": ["expressjs", "express.js", "express js"],
+    "javascript": ["ecmascript", "es6"],
+    "svelte": ["sveltekit"],
+    "jupyter": ["jupyterlab"],
+    "node.js": ["nodejs", "node js"],
+    "next.js": ["nextjs"],
+    "three.js": ["threejs"],
+    "html5": ["html"],
+    "css3": ["css"],
+    "tailwind css": ["tailwind", "tailwindcss"],
+    "scikit-learn": ["sklearn", "scikit learn"],
+    "hugging face": ["huggingface"],
+    "llm": ["llms", "large language model", "large language models"],
+    "nlp": ["natural language processing"],
+    "rag": ["retrieval augmented generation", "retrieval-augmented generation"],
+    "generative ai": ["genai", "gen ai"],
+    "ci/cd": ["ci cd", "ci-cd", "continuous integration", "continuous delivery", "continuous deployment"],
+    "rest apis": ["rest api", "restful"],
+    "restful apis": ["restful api", "restful", "rest api"],
+    "apache spark": ["spark", "pyspark"],
+    "etl pipelines": ["etl"],
+    "spring boot": ["springboot"],
+    "gcp": ["google cloud", "google cloud platform"],
+    "aws": ["amazon web services"],
+    "azure data factory": ["adf"],
+    "linux administration": ["linux"],
+    "a/b testing": ["ab testing", "a/b test", "a/b tests", "split testing"],
+    "mongodb": ["mongo"],
+    "postgresql": ["postgres"],
+}
+
+# Words that mark a skill as a broad competency that can be shown without being named
+CONCEPT_WORDS = {
+    "analysis", "design", "management", "strategy", "research", "engineering", "learning",
+    "testing", "optimization", "methodologies", "services", "databases", "pipelines",
+    "administration", "networking", "evaluation", "visualization", "statistics", "mapping",
+    "prioritization", "definition", "lifecycle", "stories", "roadmapping", "warehousing",
+    "authentication", "authorization", "microservices", "apis",
+}
+
+# A lexical miss only proves absence for known tool names: the built-in role skills, the alias
+# table, and single tokens spelled like a technology (AWS, PyTorch, Node.js, C++)
+KNOWN_SKILLS = {normalize_skill(skill) for skill in ALL_ROLE_SKILLS} | set(SKILL_ALIASES)
+TECHNOLOGY_TOKEN_PATTERN = re.compile(r"^(?:[A-Z0-9]{2,}|\w*[a-z][A-Z]\w*|\w*[.+#0-9]\S*)$")
+
+# Resume section headings, shared by skill evidence detection and the resume digest
+SECTION_HEADINGS = {
+    "summary": ["summary", "professional summary", "profile", "objective", "about", "about me"],
+    "experience": ["experience", "work experience", "professional experience", "employment",
+                   "employment history", "work history"],
+    "projects": ["projects", "personal projects", "key projects", "academic projects", "open source"],
+    "skills": ["skills", "technical skills", "core skills", "key skills", "core competencies", "technologies",
+               "tools"],
+    "education": ["education", "academic background", "qualifications"],
+    "certifications": ["certifications", "certificates", "licenses", "courses", "training"],
+    "awards": ["awards", "achievements"],
+    "publications": ["publications"],
+    "languages": ["languages"],
+    "interests": ["interests"],
+    "volunteering": ["volunteering", "volunteer experience"],
+    "leadership": ["leadership"],
+    "references": ["references"],
+}
+_HEADING_TO_SECTION = {heading: section for section, headings in SECTION_HEADINGS.items() for heading in headings}
+# Single-word headings also identify all-caps variants such as "RELEVANT EXPERIENCE"
+_HEADING_WORD_TO_SECTION = {heading: section for heading, section in _HEADING_TO_SECTION.items() if " " not in heading}
+
+# Sections where a mention shows the skill was used, not just listed
+EVIDENCE_SECTIONS = {"experience", "projects"}
+
+# Provisional scores for skills with a clear lexical outcome
+ABSENT_SCORE = 0
+EVIDENCED_SCORE = 8
+EVIDENCED_MIN_COUNT = 2
+
+
+class AhoCorasick:
+    """Multi-pattern matcher that finds every pattern occurrence in one pass over the text"""
+
+    def __init__(self):
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+
+    def add(self, pattern, value):
+        state = 0
+        for char in pattern:
+            if char not in self._goto[state]:
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[state][char] = len(self._goto) - 1
+            state = self._goto[state][char]
+        self._output[state].append((len(pattern), value))
+
+    def build(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+        return self
+
+    def iter(self, text):
+        """Yield (start, end, value) for every match"""
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for length, value in self._output[state]:
+                yield index - length + 1, index + 1, value
+
+
+def skill_aliases(skill):
+    """All lowercase spellings that count as a mention of the skill"""
+    name = normalize_skill(skill)
+    aliases = {name}
+    parenthetical = re.match(r"^(.*?)\s*\((.+)\)$", name)
+    parts = [part.strip() for part in parenthetical.groups()] if parenthetical else [name]
+    aliases.update(parts)
+    # Alternatives such as "aws/gcp" or "sql & nosql"; short pairs like "ci/cd" and "a/b" stay whole
+    for part in parts:
+        for alternative in re.split(r"\s+&\s+|\s+and\s+|\s*,\s*|(?<=\w{3})/(?=\w{3})", part):
+            if len(alternative.strip()) >= 3:
+                aliases.add(alternative.strip())
+    aliases.update(SKILL_ALIASES.get(name, []))
+    return {alias for alias in aliases if alias}
+
+
+def is_concrete_skill(skill):
+    """True for named tools and technologies, whose absence from the text is decisive"""
+    name = normalize_skill(skill)
+    if set(re.findall(r"[a-z]+", name)) & CONCEPT_WORDS:
+        return False
+    if name in KNOWN_SKILLS:
+        return True
+    return " " not in skill.strip() and bool(TECHNOLOGY_TOKEN_PATTERN.match(skill.strip()))
+
+
+@functools.lru_cache(maxsize=64)
+def get_matcher(skills):
+    """Automaton over the aliases of a tuple of skills, built once per skill list"""
+    matcher = AhoCorasick()
+    for skill in skills:
+        for alias in skill_aliases(skill):
+            matcher.add(alias, skill)
+    return matcher.build()
+
+
+def heading_section(line):
+    """Section a resume line is the heading of, or None for any other line"""
+    name = line.strip().rstrip(":").strip()
+    heading = " ".join(re.sub(r"[^a-z ]", " ", name.lower()).split())
+    if heading in _HEADING_TO_SECTION:
+        return _HEADING_TO_SECTION[heading]
+    # Other headings must be short all-caps lines naming a known section, which rules out
+    # the candidate's name and skill lists such as "AWS, GCP, SQL"
+    if len(name) <= 40 and name.isupper() and "," not in name:
+        return next((_HEADING_WORD_TO_SECTION[word] for word in heading.split() if word in _HEADING_WORD_TO_SECTION),
+                    None)
+    return None
+
+
+def find_sections(text):
+    """Sorted (offset, section) pairs for the section headings found in the text"""
+    sections = []
+    offset = 0
+    for line in text.splitlines(keepends=True):
+        section = heading_section(line)
+        if section:
+            sections.append((offset, section))
+        offset += len(line)
+    return sections
+
+
+def _is_word_boundary(text, start, end):
+    before = text[start - 1] if start > 0 else " "
+    after = text[end] if end < len(text) else " "
+    return not before.isalnum() and not after.isalnum()
+
+
+def scan_skills(resume_text, skills):
+    """Count skill mentions and the resume sections they appear in, in one pass"""
+    lowered = resume_text.lower()
+    sections = find_sections(resume_text)
+    section_offsets = [offset for offset, _ in sections]
+    hits = {skill: {"count": 0, "sections": set()} for skill in skills}
+
+    last_end = {}
+    for start, end, skill in get_matcher(tuple(dict.fromkeys(skills))).iter(lowered):
+        # Ignore matches inside longer words and overlapping aliases of the same skill
+        if not _is_word_boundary(lowered, start, end) or start < last_end.get(skill, 0):
+            continue
+        last_end[skill] = end
+        hits[skill]["count"] += 1
+        position = bisect.bisect_right(section_offsets, start) - 1
+        hits[skill]["sections"].add(sections[position][1] if position >= 0 else "header")
+    return hits
+
+
+def has_variant(tokens, skill):
+    """True if a word of the text starts or ends with an alias of the skill, e.g. ReactJS or PostgreSQL"""
+    for alias in skill_aliases(skill):
+        compact = re.sub(r"[^a-z0-9]", "", alias)
+        if len(compact) >= 3 and any(
+            token != compact and (token.startswith(compact) or token.endswith(compact)) for token in tokens
+        ):
+            return True
+    return False
+
+
+def prescore_skills(resume_text, skills):
+    """Split skills into provisional lexical scores and skills that still need the LLM.
+
+    Returns ({skill: (skill, score, reasoning)}, [ambiguous skills]).
+    """
+    scored = {}
+    ambiguous = []
+    tokens = None
+    for skill, hit in scan_skills(resume_text, skills).items():
+        longest_alias = max(len(alias) for alias in skill_aliases(skill))
+        evidence = hit["sections"] & EVIDENCE_SECTIONS
+
+        absent = hit["count"] == 0 and is_concrete_skill(skill)
+        if absent:
+            # A spelling variant the aliases miss leaves the skill to the LLM rather than scoring it 0
+            if tokens is None:
+                tokens = set(re.findall(r"[a-z0-9]+", resume_text.lower()))
+            absent = not has_variant(tokens, skill)
+
+        if absent:
+            scored[skill] = (skill, ABSENT_SCORE, f"{skill} is not mentioned anywhere in the resume.")
+        elif hit["count"] >= EVIDENCED_MIN_COUNT and evidence and longest_alias >= 3:
+            scored[skill] = (
+                skill,
+                EVIDENCED_SCORE,
+                f"{skill} is mentioned {hit['count']} times, including in the "
+                f"{' and '.join(sorted(evidence))} section.",
+            )
+        else:
+            ambiguous.append(skill)
+    return scored, ambiguous
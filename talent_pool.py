@@ -0,0 +1,235 @@
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import faiss
+import numpy as np
+
+from cache import CACHE_DIR
+
+TALENT_POOL_DIR = os.getenv("TALENT_POOL_DIR", os.path.join(CACHE_DIR, "talent_pool"))
+
+# Vectors held in the small writable delta index before it is merged into the main index
+COMPACT_THRESHOLD = int(os.getenv("TALENT_POOL_COMPACT_THRESHOLD", "5000"))
+
+# Map the flat vector storage from disk instead of reading it into memory
+MMAP_FLAG = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP)
+
+
+def _normalize(vectors):
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+class TalentPool:
+    """Persistent FAISS index of resume chunks from every analyzed candidate.
+
+    Vectors live in two inner-product indexes over normalized embeddings: a
+    large main index that is memory-mapped from disk, and a small delta index
+    that takes new candidates. Deletes remove chunk rows from the metadata
+    database, so stale vectors in the main index are ignored until compact()
+    rewrites it. Only one process should write to a pool at a time.
+    """
+
+    def __init__(self, directory=TALENT_POOL_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.main_path = os.path.join(directory, "main.index")
+        self.delta_path = os.path.join(directory, "delta.index")
+        self._lock = threading.RLock()
+
+        self._db = sqlite3.connect(os.path.join(directory, "pool.sqlite3"), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS candidates ("
+            "candidate_id TEXT PRIMARY KEY, name TEXT, metadata TEXT, added_at REAL NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS chunks ("
+            "vector_id INTEGER PRIMARY KEY AUTOINCREMENT, candidate_id TEXT NOT NULL, text TEXT NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS chunks_candidate ON chunks (candidate_id)")
+        self._db.commit()
+
+        self._main = faiss.read_index(self.main_path, MMAP_FLAG) if os.path.exists(self.main_path) else None
+        self._delta = faiss.read_index(self.delta_path) if os.path.exists(self.delta_path) else None
+
+    def _new_index(self, dimension):
+        return faiss.IndexIDMap2(faiss.IndexFlatIP(dimension))
+
+    def _write_index(self, index, path):
+        tmp_path = f"{path}.tmp"
+        faiss.write_index(index, tmp_path)
+        os.replace(tmp_path, path)
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM candidates").fetchone()[0]
+
+    def add_candidate(self, candidate_id, chunks, chunk_embeddings, name=None, metadata=None):
+        """Add or replace a candidate's resume chunks without rebuilding the index"""
+        if not chunks:
+            return
+        vectors = _normalize(chunk_embeddings)
+        with self._lock:
+            self._delete(candidate_id)
+            self._db.executemany(
+                "INSERT INTO chunks (candidate_id, text) VALUES (?, ?)",
+                [(candidate_id, chunk) for chunk in chunks],
+            )
+            last_id = self._db.execute("SELECT MAX(vector_id) FROM chunks").fetchone()[0]
+            ids = np.arange(last_id - len(chunks) + 1, last_id + 1, dtype=np.int64)
+            self._db.execute(
+                "INSERT INTO candidates (candidate_id, name, metadata, added_at) VALUES (?, ?, ?, ?)",
+                (candidate_id, name or candidate_id, json.dumps(metadata or {}), time.time()),
+            )
+
+            if self._delta is None:
+                self._delta = self._new_index(vectors.shape[1])
+            self._delta.add_with_ids(vectors, ids)
+            self._write_index(self._delta, self.delta_path)
+            self._db.commit()
+
+            if self._delta.ntotal >= COMPACT_THRESHOLD:
+                self.compact()
+
+    def _delete(self, candidate_id):
+        ids = [row[0] for row in self._db.execute(
+            "SELECT vector_id FROM chunks WHERE candidate_id = ?", (candidate_id,)
+        )]
+        if not ids:
+            return False
+        if self._delta is not None:
+            self._delta.remove_ids(np.asarray(ids, dtype=np.int64))
+        self._db.execute("DELETE FROM chunks WHERE candidate_id = ?", (candidate_id,))
+        self._db.execute("DELETE FROM candidates WHERE candidate_id = ?", (candidate_id,))
+        return True
+
+    def delete_candidate(self, candidate_id):
+        """Remove a candidate; returns False if it was not in the pool"""
+        with self._lock:
+            deleted = self._delete(candidate_id)
+            if deleted and self._delta is not None:
+                self._write_index(self._delta, self.delta_path)
+            self._db.commit()
+            return deleted
+
+    def compact(self):
+        """Merge the delta index into the main index and drop deleted vectors"""
+        with self._lock:
+            live_ids = np.fromiter(
+                (row[0] for row in self._db.execute("SELECT vector_id FROM chunks ORDER BY vector_id")),
+                dtype=np.int64,
+            )
+            indexes = [index for index in (self._main, self._delta) if index is not None and index.ntotal]
+            if not indexes:
+                return
+            merged = self._new_index(indexes[0].d)
+            for index in indexes:
+                index_ids = faiss.vector_to_array(index.id_map)
+                keep = index_ids[np.isin(index_ids, live_ids)]
+                if len(keep):
+                    merged.add_with_ids(index.reconstruct_batch(keep), keep)
+
+            self._write_index(merged, self.main_path)
+            self._main = faiss.read_index(self.main_path, MMAP_FLAG)
+            self._delta = None
+            if os.path.exists(self.delta_path):
+                os.unlink(self.delta_path)
+
+    def search(self, query_embedding, k=5, chunks_per_candidate=3):
+        """Top-k candidates for a query embedding, each with its best matching chunks"""
+        query = _normalize([query_embedding])
+        with self._lock:
+            hits = {}
+            fetch = max(k * 20, 50)
+            for index in (self._main, self._delta):
+                if index is None or not index.ntotal:
+                    continue
+                scores, ids = index.search(query, min(fetch, index.ntotal))
+                for score, vector_id in zip(scores[0], ids[0]):
+                    if vector_id >= 0:
+                        hits[int(vector_id)] = float(score)
+            if not hits:
+                return []
+
+            placeholders = ",".join("?" * len(hits))
+            rows = self._db.execute(
+                "SELECT chunks.vector_id, chunks.candidate_id, chunks.text, candidates.name, candidates.metadata "
+                f"FROM chunks JOIN candidates USING (candidate_id) WHERE chunks.vector_id IN ({placeholders})",
+                list(hits),
+            ).fetchall()
+
+        candidates = {}
+        # Vectors without a chunk row were deleted and are skipped here
+        for vector_id, candidate_id, text, name, metadata in rows:
+            candidate = candidates.setdefault(candidate_id, {
+                "candidate_id": candidate_id,
+                "name": name,
+                "metadata": json.loads(metadata),
+                "score": 0.0,
+                "chunks": [],
+            })
+            candidate["chunks"].append({"text": text, "score": hits[vector_id]})
+            candidate["score"] = max(candidate["score"], hits[vector_id])
+
+        ranked = sorted(candidates.values(), key=lambda candidate: candidate["score"], reverse=True)[:k]
+        for candidate in ranked:
+            candidate["chunks"] = sorted(candidate["chunks"], key=lambda chunk: chunk["score"], reverse=True)
+            candidate["chunks"] = candidate["chunks"][:chunks_per_candidate]
+        return ranked
+
+    def search_text(self, query, k=5, chunks_per_candidate=3):
+        """Search the pool with a natural language query"""
+        from llm_clients import get_embeddings
+
+        return self.search(get_embeddings().embed_query(query), k, chunks_per_candidate)
+
+
+_talent_pool = None
+_talent_pool_lock = threading.Lock()
+
+
+def get_talent_pool():
+    """Process-wide talent pool"""
+    global _talent_pool
+    with _talent_pool_lock:
+        if _talent_pool is None:
+            _talent_pool = TalentPool()
+        return _talent_pool
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search and maintain the persistent talent pool")
+    parser.add_argument("--dir", default=TALENT_POOL_DIR, help="Talent pool directory")
+    commands = parser.add_subparsers(dest="command", required=True)
+    search = commands.add_parser("search", help="Find candidates matching a query")
+    search.add_argument("query")
+    search.add_argument("-k", type=int, default=5, help="Number of candidates to return")
+    delete = commands.add_parser("delete", help="Remove a candidate")
+    delete.add_argument("candidate_id")
+    commands.add_parser("compact", help="Merge pending additions and drop deleted vectors")
+    args = parser.parse_args()
+
+    pool = TalentPool(args.dir)
+    if args.command == "search":
+        started = time.perf_counter()
+        results = pool.search_text(args.query, k=args.k)
+        print(f"{len(results)} candidates in {(time.perf_counter() - started) * 1000:.1f} ms")
+        for candidate in results:
+            print(f"{candidate['score']:.3f}  {candidate['name']} ({candidate['candidate_id']})")
+            for chunk in candidate["chunks"]:
+                print(f"    {chunk['score']:.3f}  {chunk['text'][:120]!r}")
+    elif args.command == "delete":
+        print("Deleted" if pool.delete_candidate(args.candidate_id) else "Candidate not found")
+    else:
+        pool.compact()
+        print(f"Compacted pool of {len(pool)} candidates")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+import asyncio
+import bisect
+import contextlib
+import contextvars
+import functools
+import itertools
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+# Off by default; span() then returns a shared no-op object and records nothing
+ENABLED = os.getenv("TELEMETRY_ENABLED", "").lower() in ("1", "true", "yes")
+
+# Prometheus text exposition: rewritten after every trace and/or served over HTTP
+TELEMETRY_TEXTFILE = os.getenv("TELEMETRY_TEXTFILE")
+TELEMETRY_PORT = int(os.getenv("TELEMETRY_PORT", "0"))
+
+METRIC_PREFIX = "resume_agent"
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# Numeric span attributes that are also summed into per-span counters
+COUNTED_ATTRIBUTES = ("prompt_chars", "response_chars", "retries", "texts", "cache_hits", "cache_misses")
+
+_current_span = contextvars.ContextVar("telemetry_span", default=None)
+_current_trace = contextvars.ContextVar("telemetry_trace", default=None)
+_span_ids = itertools.count(1)
+
+
+class Metrics:
+    """In-process counters, gauges and duration histograms rendered in Prometheus text format"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._gauges = {}
+        self._histograms = {}
+
+    def inc(self, name, labels, value=1):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set(self, name, labels, value):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._gauges[key] = value
+
+    def observe(self, name, labels, value):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [[0] * len(DURATION_BUCKETS), 0.0, 0]
+            index = bisect.bisect_left(DURATION_BUCKETS, value)
+            if index < len(DURATION_BUCKETS):
+                histogram[0][index] += 1
+            histogram[1] += value
+            histogram[2] += 1
+
+    def render(self):
+        def labels_text(labels, extra=()):
+            pairs = [*labels, *extra]
+            if not pairs:
+                return ""
+            return "{" + ",".join(f'{key}="{str(value)}"' for key, value in pairs) + "}"
+
+        with self._lock:
+            counters = sorted(self._counters.items())
+            gauges = sorted(self._gauges.items())
+            histograms = sorted((key, ([*buckets], total, count)) for key, (buckets, total, count) in self._histograms.items())
+
+        lines = []
+        typed = set()
+        for (name, labels), value in counters:
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name}{labels_text(labels)} {value}")
+        for (name, labels), value in gauges:
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name}{labels_text(labels)} {value}")
+        for (name, labels), (buckets, total, count) in histograms:
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} histogram")
+            cumulative = 0
+            for bound, bucket_count in zip(DURATION_BUCKETS, buckets):
+                cumulative += bucket_count
+                lines.append(f"{name}_bucket{labels_text(labels, [('le', bound)])} {cumulative}")
+            lines.append(f"{name}_bucket{labels_text(labels, [('le', '+Inf')])} {count}")
+            lines.append(f"{name}_sum{labels_text(labels)} {total}")
+            lines.append(f"{name}_count{labels_text(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+
+METRICS = Metrics()
+
+
+class Span:
+    """One timed stage; attributes hold sizes, cache results and retries"""
+
+    __slots__ = ("id", "name", "attrs", "parent", "start", "duration", "status", "_token")
+
+    def __init__(self, name, attrs):
+        self.id = next(_span_ids)
+        self.name = name
+        self.attrs = attrs
+        self.duration = None
+        self.status = "ok"
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def add(self, attr, value=1):
+        self.attrs[attr] = self.attrs.get(attr, 0) + value
+
+    def __enter__(self):
+        self.parent = _current_span.get()
+        self._token = _current_span.set(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.perf_counter() - self.start
+        try:
+            _current_span.reset(self._token)
+        except ValueError:
+            # Generators may finish a span in a different context than they started it
+            _current_span.set(self.parent)
+        if exc_type is not None:
+            self.status = "error"
+            self.attrs["error"] = exc_type.__name__
+
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.spans.append(self)
+
+        labels = {"span": self.name}
+        METRICS.observe(f"{METRIC_PREFIX}_span_duration_seconds", labels, self.duration)
+        if exc_type is not None:
+            METRICS.inc(f"{METRIC_PREFIX}_span_errors_total", labels)
+        for attr in COUNTED_ATTRIBUTES:
+            if self.attrs.get(attr):
+                METRICS.inc(f"{METRIC_PREFIX}_{attr}_total", labels, self.attrs[attr])
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def set(self, **attrs):
+        pass
+
+    def add(self, attr, value=1):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def span(name, **attrs):
+    """Context manager timing one stage, nested under the current span"""
+    if not ENABLED:
+        return _NOOP_SPAN
+    return Span(name, attrs)
+
+
+def traced(name):
+    """Decorator running a function or coroutine function inside a span"""
+    def decorate(func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def current_span():
+    """Innermost open span, or a no-op span"""
+    return (_current_span.get() if ENABLED else None) or _NOOP_SPAN
+
+
+def record_cache(cache, hits=0, misses=0):
+    """Count cache hits and misses, globally and on the current span"""
+    if not ENABLED:
+        return
+    for result, count in (("hit", hits), ("miss", misses)):
+        if count:
+            METRICS.inc(f"{METRIC_PREFIX}_cache_requests_total", {"cache": cache, "result": result}, count)
+    current = _current_span.get()
+    if current is not None:
+        current.add("cache_hits", hits)
+        current.add("cache_misses", misses)
+
+
+def count(name, value=1, **labels):
+    """Add to a counter outside of any span"""
+    if ENABLED:
+        METRICS.inc(f"{METRIC_PREFIX}_{name}", labels, value)
+
+
+def gauge(name, value, **labels):
+    """Set a gauge such as a queue depth"""
+    if ENABLED:
+        METRICS.set(f"{METRIC_PREFIX}_{name}", labels, value)
+
+
+def observe(name, seconds, **labels):
+    """Record a duration outside of any span"""
+    if ENABLED:
+        METRICS.observe(f"{METRIC_PREFIX}_{name}", labels, seconds)
+
+
+class Trace:
+    """Spans recorded while a trace() block is active, across threads and tasks it starts"""
+
+    def __init__(self):
+        self.spans = []
+        self.start = time.perf_counter()
+
+    def to_list(self):
+        return [
+            {
+                "id": recorded.id,
+                "parent": recorded.parent.id if recorded.parent else None,
+                "name": recorded.name,
+                "start_ms": round((recorded.start - self.start) * 1000, 2),
+                "duration_ms": round(recorded.duration * 1000, 2),
+                "status": recorded.status,
+                **recorded.attrs,
+            }
+            for recorded in sorted(self.spans, key=lambda recorded: recorded.start)
+        ]
+
+
+@contextlib.contextmanager
+def trace():
+    """Collect every span finished inside the block; yields None when telemetry is off"""
+    if not ENABLED:
+        yield None
+        return
+    current = Trace()
+    token = _current_trace.set(current)
+    try:
+        yield current
+    finally:
+        _current_trace.reset(token)
+        if TELEMETRY_TEXTFILE:
+            write_textfile(TELEMETRY_TEXTFILE)
+
+
+def attach_trace(result, recorded):
+    """Add a finished trace's spans to a result dict under the "trace" key"""
+    if recorded is not None and result:
+        result["trace"] = recorded.to_list()
+    return result
+
+
+def render_metrics():
+    """All metrics in Prometheus text exposition format"""
+    return METRICS.render()
+
+
+def write_textfile(path):
+    """Atomically write the metrics for a node_exporter textfile collector"""
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(render_metrics())
+        os.replace(tmp_path, path)
+    except OSError:
+        logger.exception("Could not write metrics textfile %s", path)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render_metrics().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port=TELEMETRY_PORT, host="0.0.0.0"):
+    """Serve /metrics on a background thread once per process; no-op without a port"""
+    global _server
+    with _server_lock:
+        if _server is not None or not port or not ENABLED:
+            return _server
+        _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        threading.Thread(target=_server.serve_forever, name="telemetry-metrics", daemon=True).start()
+        logger.info("Serving metrics on http://%s:%d/metrics", host, port)
+        return _server
@@ -0,0 +1,42 @@
+import pytest
+
+from skill_matcher import ABSENT_SCORE, prescore_skills, skill_aliases
+
+RESUME = """Jane Doe
+
+EXPERIENCE
+Senior Engineer, Acme
+- Built customer dashboards in ReactJS and migrated legacy AngularJS apps
+- Tuned PostgreSQL and MySQL queries; Dockerized every service
+- Maintained GitHub Actions pipelines and ExpressJS APIs
+- Ran production workloads on EKS in AWS
+- Mentored four junior engineers and led a team of six
+- Designed a message-driven platform spanning twelve services
+
+SKILLS
+Python, Java
+"""
+
+
+@pytest.mark.parametrize("skill", [
+    "React", "Angular", "SQL", "Docker", "Git", "Express", "Kubernetes",
+    "Cloud platforms (AWS/GCP)", "Mentoring", "Distributed systems", "Team leadership",
+    "Object-oriented programming",
+])
+def test_spelling_variants_and_phrasings_are_not_scored_absent(skill):
+    scored, ambiguous = prescore_skills(RESUME, [skill])
+    assert scored.get(skill, (skill, None, ""))[1] != ABSENT_SCORE
+    assert skill in ambiguous or skill in scored
+
+
+@pytest.mark.parametrize("skill", ["Redis", "Terraform", "PyTorch", "Node.js"])
+def test_known_tools_missing_from_the_resume_are_scored_absent(skill):
+    scored, ambiguous = prescore_skills(RESUME, [skill])
+    assert scored[skill][1] == ABSENT_SCORE
+    assert ambiguous == []
+
+
+def test_parenthetical_and_slash_alternatives_are_aliases():
+    assert {"cloud platforms", "aws", "gcp"} <= skill_aliases("Cloud platforms (AWS/GCP)")
+    assert "ci" not in skill_aliases("CI/CD")
+    assert "sre" in skill_aliases("Site Reliability Engineering (SRE)")
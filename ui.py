@@ -1,8 +1,10 @@
 import streamlit as st
-import pandas as pd
 import base64
+import functools
 import io
-import matplotlib.pyplot as plt
+import math
+
+import reports
 
 import os
 google_api_key = os.getenv("GOOGLE_API_KEY")
@@ -93,7 +95,7 @@ def setup_sidebar():
 
 
 
-def role_selection_section(role_requirements):
+def role_selection_section(role_requirements, cutoff_score=75):
     st.markdown('<div class="card">', unsafe_allow_html=True)
     
     col1, col2 = st.columns([2, 1])
@@ -113,7 +115,7 @@ def role_selection_section(role_requirements):
     
     if not upload_jd:
         st.info(f"Required skills: {', '.join(role_requirements[role])}")
-        st.markdown(f"<p>Cutoff Score for selection: <b>{75}/100</b></p>", unsafe_allow_html=True)
+        st.markdown(f"<p>Cutoff Score for selection: <b>{cutoff_score}/100</b></p>", unsafe_allow_html=True)
     
     st.markdown('</div>', unsafe_allow_html=True)
     
@@ -135,51 +137,54 @@ def resume_upload_section():
 
 
 
-def create_score_pie_chart(score):
-    """Create a professional pie chart for the score visualization"""
-    fig, ax = plt.subplots(figsize=(4, 4), facecolor='#111111')
-    
-    # Data
-    sizes = [score, 100 - score]
-    labels = ['', '']  # We'll use annotation instead
-    colors = ["#1976d2", "#333333"]
-    explode = (0.05, 0)  # explode the 1st slice (Score)
-    
-    # Plot
-    wedges, texts = ax.pie(
-        sizes, 
-        labels=labels, 
-        colors=colors,
-        explode=explode, 
-        startangle=90,
-        wedgeprops={'width': 0.5, 'edgecolor': 'black', 'linewidth': 1}
+@functools.lru_cache(maxsize=256)
+def create_score_gauge(score, cutoff_score=75):
+    """Donut gauge of the score as inline SVG, rendered once per (score, cutoff)"""
+    radius = 70
+    circumference = 2 * math.pi * radius
+    filled = circumference * max(0, min(score, 100)) / 100
+    status = "PASS" if score >= cutoff_score else "FAIL"
+    status_color = "#4CAF50" if score >= cutoff_score else "#1976d2"
+
+    # Tick across the ring marking the cutoff, measured clockwise from the top
+    angle = math.radians(cutoff_score / 100 * 360 - 90)
+    tick = [(100 + r * math.cos(angle), 100 + r * math.sin(angle)) for r in (radius - 18, radius + 18)]
+
+    return (
+        '<svg viewBox="0 0 200 200" width="100%" style="max-width: 260px; background-color: #111111; border-radius: 8px;" '
+        f'role="img" aria-label="Score {score} out of 100, cutoff {cutoff_score}">'
+        f'<circle cx="100" cy="100" r="{radius}" fill="none" stroke="#333333" stroke-width="30"/>'
+        f'<circle cx="100" cy="100" r="{radius}" fill="none" stroke="#1976d2" stroke-width="30" '
+        f'stroke-dasharray="{filled:.2f} {circumference:.2f}" transform="rotate(-90 100 100)"/>'
+        f'<line x1="{tick[0][0]:.2f}" y1="{tick[0][1]:.2f}" x2="{tick[1][0]:.2f}" y2="{tick[1][1]:.2f}" '
+        'stroke="white" stroke-width="2"/>'
+        f'<text x="100" y="100" text-anchor="middle" font-size="30" font-weight="bold" fill="white">{score}%</text>'
+        f'<text x="100" y="124" text-anchor="middle" font-size="16" font-weight="bold" fill="{status_color}">{status}</text>'
+        '</svg>'
     )
-    
-    # Draw a circle in the center to make it a donut chart
-    centre_circle = plt.Circle((0, 0), 0.25, fc='#111111')
-    ax.add_artist(centre_circle)
-    
-    # Equal aspect ratio ensures that pie is drawn as a circle
-    ax.set_aspect('equal')
-    
-    # Add score text in the center
-    ax.text(0, 0, f"{score}%", 
-            ha='center', va='center', 
-            fontsize=24, fontweight='bold', 
-            color='white')
-    
-    # Add pass/fail indicator
-    status = "PASS" if score >= 75 else "FAIL"
-    status_color = "#4CAF50" if score >= 75 else "#1976d2"
-    ax.text(0, -0.15, status, 
-            ha='center', va='center', 
-            fontsize=14, fontweight='bold', 
-            color=status_color)
-    
-    # Set the background color
-    ax.set_facecolor('#111111')
-    
-    return fig
+
+
+
+
+JOB_STAGE_LABELS = {
+    "queued": "⏳ Waiting for a free worker...",
+    "extracting": "📄 Extracting text...",
+    "embedding": "🧮 Indexing resume...",
+    "scoring": "🔍 Scoring skills",
+    "weaknesses": "🛠️ Analyzing weaknesses",
+}
+
+def display_job_progress(job):
+    """Progress bar for a queued or running analysis job"""
+    label = JOB_STAGE_LABELS.get(job["stage"], job["stage"])
+    stages = list(JOB_STAGE_LABELS)
+    position = stages.index(job["stage"]) if job["stage"] in stages else 0
+    fraction = 0.0
+    if job["total"]:
+        label += f" ({job['done']}/{job['total']})"
+        fraction = job["done"] / job["total"]
+    # Each stage fills an equal share of the bar
+    st.progress(min((position + fraction) / len(stages), 1.0), text=label)
 
 
 
@@ -189,6 +194,7 @@ def display_analysis_results(analysis_result):
         return
 
     overall_score = analysis_result.get('overall_score', 0)
+    cutoff_score = analysis_result.get('cutoff_score', 75)
     selected = analysis_result.get("selected", False)
     skill_scores = analysis_result.get("skill_scores", {})
     detailed_weaknesses = analysis_result.get("detailed_weaknesses", [])
@@ -204,8 +210,7 @@ def display_analysis_results(analysis_result):
 
     with col1:
         st.metric("Overall Score", f"{overall_score}/100")
-        fig = create_score_pie_chart(overall_score)
-        st.pyplot(fig)
+        st.markdown(create_score_gauge(overall_score, cutoff_score), unsafe_allow_html=True)
 
     with col2:
         if selected:
@@ -276,54 +281,20 @@ def display_analysis_results(analysis_result):
                                unsafe_allow_html=True)
     
     st.markdown("---")
-    col1, col2, col3 = st.columns([1, 2, 1])
-    with col2:
-        report_content = f"""
-# Resume Analysis Report
-
-## Overall Score: {overall_score}/100
-
-Status: {"✅ Shortlisted" if selected else "❌ Not Selected"}
-
-## Analysis Reasoning
-{analysis_result.get('reasoning', 'No reasoning provided.')}
-
-## Strengths
-{", ".join(strengths if strengths else ["None identified"])}
-
-## Areas for Improvement
-{", ".join(missing_skills if missing_skills else ["None identified"])}
-
-## Detailed Weakness Analysis
-"""
-        # Add detailed weaknesses to report
-        for weakness in detailed_weaknesses:
-            skill_name = weakness.get('skill', '')
-            score = weakness.get('score', 0)
-            detail = weakness.get('detail', 'No specific details provided.')
-            
-            # Clean JSON formatting if it appears in the text
-            if detail.startswith('```json') or '{' in detail:
-                detail = "The resume lacks examples of this skill."
-                
-            report_content += f"\n### {skill_name} (Score: {score}/10)\n"
-            report_content += f"Issue: {detail}\n"
-            
-            # Add suggestions to report
-            if 'suggestions' in weakness and weakness['suggestions']:
-                report_content += "\nImprovement suggestions:\n"
-                for i, sugg in enumerate(weakness['suggestions']):
-                    report_content += f"- {sugg}\n"
-            
-            # Add example to report
-            if 'example' in weakness and weakness['example']:
-                report_content += f"\nExample: {weakness['example']}\n"
-            
-        report_content += "\n---\nAnalysis provided by Recruitment Agent"
-        
-        report_b64 = base64.b64encode(report_content.encode()).decode()
-        href = f'<a class="download-btn" href="data:text/plain;base64,{report_b64}" download="resume_analysis.txt">📊 Download Analysis Report</a>'
-        st.markdown(href, unsafe_allow_html=True)
+    # Reports are served as downloads instead of being inlined in the page; render_report builds
+    # each format once per analysis
+    download_labels = {"txt": "📊 Download Analysis Report", "json": "Download JSON", "csv": "Download CSV"}
+    for column, (fmt, label) in zip(st.columns(3), download_labels.items()):
+        _, mime, extension = reports.REPORT_FORMATS[fmt]
+        with column:
+            st.download_button(
+                label,
+                data=reports.render_report(analysis_result, fmt),
+                file_name=f"resume_analysis.{extension}",
+                mime=mime,
+                key=f"download_report_{fmt}",
+                on_click="ignore",
+            )
 
     st.markdown('</div>', unsafe_allow_html=True)
 
@@ -332,7 +303,7 @@ Status: {"✅ Shortlisted" if selected else "❌ Not Selected"}
 
 
 
-def resume_qa_section(has_resume, ask_question_func=None):
+def resume_qa_section(has_resume, ask_question_func=None, stream_answer_func=None):
     if not has_resume:
         st.warning("Please upload and analyze a resume first.")
         return
@@ -340,9 +311,19 @@ def resume_qa_section(has_resume, ask_question_func=None):
     st.markdown('<div class="card">', unsafe_allow_html=True)
     
     st.subheader("Ask Questions About the Resume")
-    user_question = st.text_input("Enter your question about the resume:", placeholder="What is the candidate's most recent experience?")
+    # Preset questions from the examples below arrive through session state
+    user_question = st.text_input(
+        "Enter your question about the resume:",
+        value=st.session_state.get("current_question", ""),
+        placeholder="What is the candidate's most recent experience?"
+    )
     
-    if user_question and ask_question_func:
+    if user_question and stream_answer_func:
+        # Tokens are written as they arrive instead of after the full response
+        st.markdown('<div style="background-color: #111122; padding: 15px; border-radius: 5px; border-left: 5px solid #1976d2;">', unsafe_allow_html=True)
+        st.write_stream(stream_answer_func(user_question))
+        st.markdown('</div>', unsafe_allow_html=True)
+    elif user_question and ask_question_func:
         with st.spinner("Searching resume and generating response..."):
             response = ask_question_func(user_question)
             
@@ -365,11 +346,11 @@ def resume_qa_section(has_resume, ask_question_func=None):
         for question in example_questions:
             if st.button(question, key=f"q_{question}"):
                 st.session_state.current_question = question
-                st.experimental_rerun()
+                st.rerun()
     
     st.markdown('</div>', unsafe_allow_html=True)
 
-def interview_questions_section(has_resume, generate_questions_func=None):
+def interview_questions_section(has_resume, generate_questions_func=None, stream_questions_func=None):
     if not has_resume:
         st.warning("Please upload and analyze a resume first.")
         return
@@ -395,39 +376,47 @@ def interview_questions_section(has_resume, generate_questions_func=None):
     num_questions = st.slider("Number of questions:", 3, 15, 5)
     
     if st.button("Generate Interview Questions"):
-        if generate_questions_func:
-            with st.spinner("Generating personalized interview questions..."):
+        if stream_questions_func or generate_questions_func:
+            status = st.empty()
+            status.info("Generating personalized interview questions...")
+            if stream_questions_func:
+                questions = stream_questions_func(question_types, difficulty, num_questions)
+            else:
                 questions = generate_questions_func(question_types, difficulty, num_questions)
-                
-                # Create content for download
-                download_content = f"# Recruitment - Interview Questions\n\n"
-                download_content += f"Difficulty: {difficulty}\n"
-                download_content += f"Types: {', '.join(question_types)}\n\n"
-                
-                for i, (q_type, question) in enumerate(questions):
-                    with st.expander(f"{q_type}: {question[:50]}..."):
-                        st.write(question)
-                        
-                        # For coding questions, add code editor
-                        if q_type == "Coding":
-                            st.code("# Write your solution here", language="python")
+            
+            # Create content for download
+            download_content = f"# Recruitment - Interview Questions\n\n"
+            download_content += f"Difficulty: {difficulty}\n"
+            download_content += f"Types: {', '.join(question_types)}\n\n"
+            
+            # Each question is rendered as soon as it has been generated
+            count = 0
+            for i, (q_type, question) in enumerate(questions):
+                count += 1
+                with st.expander(f"{q_type}: {question[:50]}..."):
+                    st.write(question)
                     
-                    # Add to download content
-                    download_content += f"## {i+1}. {q_type} Question\n\n"
-                    download_content += f"{question}\n\n"
+                    # For coding questions, add code editor
                     if q_type == "Coding":
-                        download_content += "```python\n# Write your solution here\n```\n\n"
-                
-                # Add branding to download content
-                download_content += "\n---\nQuestions generated by Recruitment Agent"
+                        st.code("# Write your solution here", language="python")
                 
-                # Add download button
-                if questions:
-                    st.markdown("---")
-                    questions_bytes = download_content.encode()
-                    b64 = base64.b64encode(questions_bytes).decode()
-                    href = f'<a class="download-btn" href="data:text/markdown;base64,{b64}" download="interview_questions.md">📝 Download All Questions</a>'
-                    st.markdown(href, unsafe_allow_html=True)
+                # Add to download content
+                download_content += f"## {i+1}. {q_type} Question\n\n"
+                download_content += f"{question}\n\n"
+                if q_type == "Coding":
+                    download_content += "```python\n# Write your solution here\n```\n\n"
+            status.empty()
+            
+            # Add branding to download content
+            download_content += "\n---\nQuestions generated by Recruitment Agent"
+            
+            # Add download button
+            if count:
+                st.markdown("---")
+                questions_bytes = download_content.encode()
+                b64 = base64.b64encode(questions_bytes).decode()
+                href = f'<a class="download-btn" href="data:text/markdown;base64,{b64}" download="interview_questions.md">📝 Download All Questions</a>'
+                st.markdown(href, unsafe_allow_html=True)
     
     st.markdown('</div>', unsafe_allow_html=True)
 